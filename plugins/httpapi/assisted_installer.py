@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: assisted_installer
+
+short_description: HttpApi plugin for the AssistedInstall API
+
+version_added: "1.0.0"
+
+description:
+    - Persistent connection to the AssistedInstall API, run by C(ansible-connection) for the whole play.
+    - The modules of this collection send their requests through it when the task runs with
+      C(ansible_connection=ansible.netcommon.httpapi), so the access token and the HTTPS connection are set up once
+      and shared by every task instead of once per task.
+    - Response bodies are relayed whole, so large lists are held in memory by the module before they are parsed.
+    - Requires the collection to be installed, see the README.
+    - Uses the E(AI_API_TOKEN) or E(AI_OFFLINE_TOKEN) environment variables of the controller to authenticate.
+
+author:
+    - Vishwanath Jayaraman (@vjayaramrh)
+"""
+
+from ansible.module_utils.common.text.converters import to_text
+from ansible.plugins.httpapi import HttpApiBase
+
+# Controller-side plugins only see module_utils through the installed collection
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apitoken
+
+BASE_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+}
+
+
+class HttpApi(HttpApiBase):
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._reauthenticated = False
+
+    def login(self, username, password):
+        self.connection._auth = {"Authorization": f"Bearer {apitoken.GetToken()}"}
+
+    def logout(self):
+        self.connection._auth = None
+
+    def handle_httperror(self, exc):
+        # The access token expired, get a new one and send the request again
+        if exc.code == 401 and not self._reauthenticated:
+            self._reauthenticated = True
+            self.login(None, None)
+            return True
+
+        # Error statuses are handed to the module like any other response
+        return exc
+
+    def send_request(self, method, path, data=None, headers=None):
+        """Send a request to the API and return its status_code, headers and body text.
+
+        path is relative to the connection host and includes the query string,
+        data is the JSON encoded body.
+        """
+        response, buffer = self.connection.send(
+            path, data, method=method, headers=BASE_HEADERS | (headers or {})
+        )
+        self._reauthenticated = False
+
+        return dict(
+            status_code=response.getcode(),
+            headers=dict(response.headers.items()),
+            text=to_text(buffer.getvalue()),
+        )
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: assisted_installer
+
+short_description: AssistedInstall clusters and hosts inventory source
+
+version_added: "1.0.0"
+
+description:
+    - Build an inventory of the hosts of the AssistedInstall clusters from C(/clusters?with_hosts=true).
+    - Every cluster is a C(cluster_<name>) group holding its hosts, cluster groups are themselves grouped by
+      C(status), C(openshift_version) and C(cpu_architecture). Hosts are grouped by C(role) and C(status).
+    - Hosts are named C(<cluster name>-<requested_hostname>), or C(<cluster name>-<host id>) when the host has no
+      requested hostname or is still named C(localhost), as the same hostname (for instance C(master-0)) is usually
+      found in several clusters. The requested hostname is the C(ansible_host) of the host.
+    - Enable the inventory cache to reuse one snapshot of the clusters for O(cache_timeout) seconds instead of
+      retrieving them on every run.
+    - Requires the collection to be installed, see the README.
+    - Uses the E(AI_API_TOKEN) or E(AI_OFFLINE_TOKEN) environment variables to authenticate.
+    - The inventory configuration file name must end with C(assisted_installer.yml) or C(assisted_installer.yaml).
+
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+
+options:
+    plugin:
+        description: Token that ensures this is a source file for the plugin.
+        required: true
+        choices: ["openshift_lab.assisted_installer.assisted_installer", "assisted_installer"]
+        type: str
+    cluster_ids:
+        description: Only include these clusters.
+        required: false
+        type: list
+        elements: str
+    with_host_inventory:
+        description: Add the parsed host hardware inventory to the C(ai_host) variable of each host.
+        required: false
+        type: bool
+        default: false
+
+author:
+    - Vishwanath Jayaraman (@vjayaramrh)
+"""
+
+EXAMPLES = r"""
+# assisted_installer.yml
+plugin: openshift_lab.assisted_installer.assisted_installer
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.cache/assisted_installer/inventory
+cache_timeout: 600
+keyed_groups:
+  - key: ai_host.discovery_agent_version
+    prefix: agent
+"""
+
+import json
+
+from ansible.errors import AnsibleError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable, Constructable
+
+# Controller-side plugins only see module_utils through the installed collection
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient
+
+# Cluster fields exposed in the ai_cluster variable of the cluster groups
+CLUSTER_FIELDS = [
+    "id",
+    "name",
+    "status",
+    "status_info",
+    "openshift_version",
+    "cpu_architecture",
+    "base_dns_domain",
+    "high_availability_mode",
+    "api_vips",
+    "ingress_vips",
+    "created_at",
+    "updated_at",
+]
+
+# Hostnames hosts report before they are named, never used as ansible_host
+LOCAL_HOSTNAMES = ["localhost", "localhost.localdomain"]
+
+# Host fields exposed in the ai_host variable of the hosts
+HOST_FIELDS = [
+    "id",
+    "cluster_id",
+    "infra_env_id",
+    "requested_hostname",
+    "role",
+    "status",
+    "status_info",
+    "discovery_agent_version",
+    "created_at",
+    "updated_at",
+]
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+
+    NAME = "openshift_lab.assisted_installer.assisted_installer"
+
+    def verify_file(self, path):
+        if super(InventoryModule, self).verify_file(path):
+            return path.endswith(("assisted_installer.yml", "assisted_installer.yaml"))
+        return False
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option("cache") and cache
+        update_cache = self.get_option("cache") and not cache
+
+        clusters = None
+        if use_cache:
+            try:
+                clusters = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+
+        if clusters is None:
+            clusters = self._fetch_clusters()
+
+        if update_cache:
+            self._cache[cache_key] = clusters
+
+        self._populate(clusters)
+
+    def _fetch_clusters(self):
+        if not apiclient.HAS_REQUESTS:
+            raise AnsibleError("The requests python library is required by the assisted_installer inventory plugin")
+
+        response = apiclient.GetClient().get("/clusters", params={"with_hosts": True})
+        if not response.ok:
+            raise AnsibleError(f"Error listing clusters: {response.text}")
+
+        cluster_ids = self.get_option("cluster_ids")
+        with_host_inventory = self.get_option("with_host_inventory")
+
+        # Only keep what the inventory uses, so that the cache holds a
+        # fraction of the clusters payload
+        clusters = []
+        for cluster in response.json():
+            if cluster_ids and cluster["id"] not in cluster_ids:
+                continue
+
+            hosts = []
+            for host in cluster.get("hosts") or []:
+                ai_host = {k: host.get(k) for k in HOST_FIELDS}
+                if with_host_inventory and host.get("inventory"):
+                    ai_host["inventory"] = json.loads(host["inventory"])
+                hosts.append(ai_host)
+
+            ai_cluster = {k: cluster.get(k) for k in CLUSTER_FIELDS}
+            ai_cluster["hosts"] = hosts
+            clusters.append(ai_cluster)
+
+        return clusters
+
+    def _add_group(self, name):
+        return self.inventory.add_group(self._sanitize_group_name(name))
+
+    def _populate(self, clusters):
+        strict = self.get_option("strict")
+
+        for cluster in clusters:
+            hosts = cluster["hosts"]
+            ai_cluster = {k: v for k, v in cluster.items() if k != "hosts"}
+
+            cluster_group = self._add_group(f"cluster_{cluster['name']}")
+            self.inventory.set_variable(cluster_group, "ai_cluster", ai_cluster)
+
+            for key in ("status", "openshift_version", "cpu_architecture"):
+                if cluster.get(key):
+                    parent = self._add_group(f"{key}_{cluster[key]}")
+                    self.inventory.add_child(parent, cluster_group)
+
+            for host in hosts:
+                # Hostnames are only unique within a cluster
+                requested_hostname = host.get("requested_hostname")
+                if requested_hostname in LOCAL_HOSTNAMES:
+                    requested_hostname = None
+                hostname = f"{cluster['name']}-{requested_hostname or host['id']}"
+                self.inventory.add_host(hostname, group=cluster_group)
+                self.inventory.set_variable(hostname, "ai_host", host)
+                self.inventory.set_variable(hostname, "ai_cluster", ai_cluster)
+                if requested_hostname:
+                    self.inventory.set_variable(hostname, "ansible_host", requested_hostname)
+
+                if host.get("role"):
+                    self.inventory.add_child(self._add_group(f"role_{host['role']}"), hostname)
+                if host.get("status"):
+                    self.inventory.add_child(self._add_group(f"host_status_{host['status']}"), hostname)
+
+                host_vars = self.inventory.get_host(hostname).get_vars()
+                self._set_composite_vars(self.get_option("compose"), host_vars, hostname, strict=strict)
+                self._add_host_to_composed_groups(self.get_option("groups"), host_vars, hostname, strict=strict)
+                self._add_host_to_keyed_groups(self.get_option("keyed_groups"), host_vars, hostname, strict=strict)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: openshift_versions
+
+short_description: Look up supported OpenShift versions
+
+version_added: "1.0.0"
+
+description:
+    - Retrieves the supported OpenShift versions on the controller, as the P(openshift_lab.assisted_installer.openshift_versions#module)
+      module does, without running a task on every host.
+    - Responses are kept in the local response cache for O(cache_ttl) seconds, shared by every lookup and task on the controller.
+    - Requires the collection to be installed, see the README.
+    - Uses the E(AI_API_TOKEN) or E(AI_OFFLINE_TOKEN) environment variables to authenticate.
+
+options:
+    _terms:
+        description:
+          - Versions of OpenShift to query, for instance V(4.16). Returns all the versions when no term is given.
+        required: False
+        type: list
+        elements: str
+
+    only_latest:
+        description: Retrieve only latest minor version
+        required: False
+        default: False
+        type: bool
+
+    latest:
+        description:
+          - Return the name of the highest version of each term, for instance V(4.16.10), instead of its versions.
+          - Single architecture releases are preferred over C(-multi) ones, pre-releases are left out unless
+            O(include_prereleases=true).
+        required: False
+        default: False
+        type: bool
+
+    include_prereleases:
+        description: Let O(latest) return a pre-release version (V(4.17.0-rc.1)).
+        required: False
+        default: False
+        type: bool
+
+    cache_ttl:
+        description: Number of seconds the response is reused from the local response cache, V(0) disables the cache.
+        required: False
+        default: 3600
+        type: int
+
+author:
+    - Michele Costa  (@nocturnalstro)
+"""
+
+EXAMPLES = r"""
+- name: Resolve the latest 4.16 patch version
+  ansible.builtin.debug:
+    msg: "{{ lookup('openshift_lab.assisted_installer.openshift_versions', '4.16', latest=true) }}"
+
+- name: List the supported OpenShift 4.16 versions
+  ansible.builtin.debug:
+    msg: "{{ lookup('openshift_lab.assisted_installer.openshift_versions', '4.16') }}"
+"""
+
+RETURN = r"""
+_raw:
+  description:
+    - A collection of supported OpenShift versions for each term, keyed by release name.
+    - With O(latest=true), the name of the highest version of each term.
+  type: list
+  elements: raw
+"""
+
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+
+# Controller-side plugins only see module_utils through the installed collection
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient, catalog, versionindex
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        if not apiclient.HAS_REQUESTS:
+            raise AnsibleError("The requests python library is required by the openshift_versions lookup")
+
+        client = apiclient.GetClient()
+        results = []
+        for version in terms or [None]:
+            params = dict(version=version, only_latest=self.get_option("only_latest"))
+            try:
+                versions = catalog.GetOpenShiftVersions(client, params, ttl=self.get_option("cache_ttl"))
+            except apiclient.ApiError as e:
+                raise AnsibleError(f"Error querying openshift versions: {e.response.text}")
+
+            if not self.get_option("latest"):
+                results.append(versions)
+                continue
+
+            # The API lists the versions in no particular order
+            index = versionindex.VersionIndex(versions)
+            latest = versionindex.Latest(index.select(include_prereleases=self.get_option("include_prereleases")))
+            if latest is None:
+                raise AnsibleError(f"No OpenShift version matches {version or 'the query'}")
+            results.append(latest)
+
+        return results
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: support_levels
+
+short_description: Look up OpenShift support levels
+
+version_added: "1.0.0"
+
+description:
+    - Query the support level of architectures or features for a given OpenShift version on the controller, as the
+      P(openshift_lab.assisted_installer.support_levels#module) module does, without running a task on every host.
+    - Responses are kept in the local response cache for O(cache_ttl) seconds, shared by every lookup and task on the controller.
+    - Requires the collection to be installed, see the README.
+    - Uses the E(AI_API_TOKEN) or E(AI_OFFLINE_TOKEN) environment variables to authenticate.
+
+options:
+    _terms:
+        description:
+          - Names of the architectures or features to return the support level of, for instance V(SNO).
+          - Returns the support level of every architecture or feature when no term is given.
+        required: False
+        type: list
+        elements: str
+
+    resource_type:
+        description: Type of resource to query
+        required: False
+        choices: [architectures, features]
+        default: features
+        type: str
+
+    openshift_version:
+        description: Version of OpenShift
+        required: True
+        type: str
+
+    cpu_architecture:
+        description: The CPU architecture of the OpenShift version
+        required: False
+        choices: [x86_64, aarch64, arm64, ppc64le, s390x, multi]
+        default: x86_64
+        type: str
+
+    platform_type:
+        description: The provider platform type
+        required: False
+        choices: [baremetal, none, nutanix, vsphere, external]
+        type: str
+
+    external_platform_name:
+        description: External platform name when platform_type is external
+        required: False
+        type: str
+
+    cache_ttl:
+        description: Number of seconds the response is reused from the local response cache, V(0) disables the cache.
+        required: False
+        default: 3600
+        type: int
+
+author:
+    - Chris Wheeler (@clwheel)
+"""
+
+EXAMPLES = r"""
+- name: Only deploy a single node cluster when it is supported on arm64
+  ansible.builtin.debug:
+    msg: SNO is supported
+  when: >-
+    lookup('openshift_lab.assisted_installer.support_levels', 'SNO',
+           openshift_version='4.16', cpu_architecture='arm64') == 'supported'
+
+- name: Query all the OpenShift architectures
+  ansible.builtin.debug:
+    msg: "{{ lookup('openshift_lab.assisted_installer.support_levels', resource_type='architectures', openshift_version='4.16') }}"
+"""
+
+RETURN = r"""
+_raw:
+  description:
+    - The support level of each term, for instance V(supported), V(tech-preview) or V(unavailable).
+    - The support levels of all the architectures or features when no term is given.
+  type: list
+"""
+
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+
+# Controller-side plugins only see module_utils through the installed collection
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient, catalog
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+
+        if not apiclient.HAS_REQUESTS:
+            raise AnsibleError("The requests python library is required by the support_levels lookup")
+
+        resource_type = self.get_option("resource_type")
+        params = {k: self.get_option(k) for k in catalog.SUPPORT_LEVELS_QUERY_PARAMS[resource_type]}
+        try:
+            response = catalog.GetSupportLevels(
+                apiclient.GetClient(), resource_type, params, ttl=self.get_option("cache_ttl")
+            )
+        except apiclient.ApiError as e:
+            raise AnsibleError(f"Error querying {resource_type}: {e.response.text}")
+
+        levels = response.get(resource_type, {})
+        if not terms:
+            return [levels]
+
+        unknown = [term for term in terms if term not in levels]
+        if unknown:
+            raise AnsibleError(f"Unknown {resource_type}: {', '.join(unknown)}")
+
+        return [levels[term] for term in terms]
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+import re
+import time
+import traceback
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apitoken, apiurl, jsonstream, ratelimit, respcache
+except ImportError:
+    from ansible.module_utils import apitoken, apiurl, jsonstream, ratelimit, respcache
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+except ImportError:
+    HAS_REQUESTS = False
+    REQUESTS_IMPORT_ERROR = traceback.format_exc()
+else:
+    HAS_REQUESTS = True
+    REQUESTS_IMPORT_ERROR = None
+
+try:
+    from ansible.module_utils.connection import Connection
+except ImportError:
+    HAS_CONNECTION = False
+else:
+    HAS_CONNECTION = True
+
+# (connect, read) timeouts in seconds applied to every request unless overridden
+DEFAULT_TIMEOUT = (10, 120)
+
+# Connection pool sizing; the pool must be at least as large as the number of
+# threads a module fans out over, otherwise connections are discarded and
+# re-established instead of being reused.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# Size of the chunks a streamed response body is read in
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Statuses worth retrying: throttling and transient gateway errors
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Methods retried whatever the error. Other methods are only retried on 429,
+# which guarantees the request was not processed.
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# Number of retries of a request and upper bound in seconds of the delay
+# between two attempts, Retry-After included
+MAX_RETRIES = 5
+MAX_RETRY_DELAY = 60
+
+_client = None
+
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+
+class ApiError(Exception):
+    """Raised when the API answers with an error status."""
+
+    def __init__(self, msg, response):
+        super().__init__(msg)
+        self.response = response
+
+
+class ApiClient:
+    """Keep-alive client for the AssistedInstall API.
+
+    Every request goes through one requests.Session so that modules issuing
+    several calls (fan-out, pagination, polling) reuse the same TCP/TLS
+    connections instead of paying a new handshake per call.
+
+    Throttled and transiently failing requests are retried up to retries
+    times with a jittered exponential backoff, or after the delay the API
+    asks for with Retry-After. A request rejected with 401 is sent once more
+    with a renewed token, as access tokens expire during long waits. When a rate_limiter is given every attempt
+    waits for one of its tokens first.
+    """
+
+    def __init__(self, token=None, base_url=apiurl.API_URL, timeout=DEFAULT_TIMEOUT, pool_maxsize=POOL_MAXSIZE,
+                 retries=MAX_RETRIES, rate_limiter=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Set headers
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+        })
+        # Tokens obtained from apitoken are renewed when the API rejects them
+        self.renew_token = token is None
+        if token is None:
+            token = apitoken.GetToken()
+        self.set_token(token)
+
+    def set_token(self, token):
+        self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def url(self, url_path):
+        if url_path.startswith("http://") or url_path.startswith("https://"):
+            return url_path
+        if not url_path.startswith("/"):
+            url_path = "/" + url_path
+        return self.base_url + url_path
+
+    def request(self, method, url_path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        delays = BackoffDelays(maximum=MAX_RETRY_DELAY)
+
+        attempt = 0
+        reauthenticated = False
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self._send(method, self.url(url_path), **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or attempt >= self.retries:
+                    raise
+                delay = next(delays)
+            else:
+                if response.status_code == 401 and self.renew_token and not reauthenticated:
+                    # The access token expired during a long run (polling,
+                    # fan-out), get a new one and send the request again
+                    reauthenticated = True
+                    response.close()
+                    self.set_token(apitoken.GetToken())
+                    continue
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                if response.status_code != 429 and not idempotent:
+                    return response
+                delay = RetryAfter(response)
+                if delay is None:
+                    delay = next(delays)
+                response.close()
+
+            attempt += 1
+            time.sleep(min(delay, MAX_RETRY_DELAY))
+
+    def _send(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def direct(self):
+        """Return the client sending requests over its own connections, for large downloads."""
+        return self
+
+    def get(self, url_path, **kwargs):
+        return self.request("GET", url_path, **kwargs)
+
+    def post(self, url_path, **kwargs):
+        return self.request("POST", url_path, **kwargs)
+
+    def patch(self, url_path, **kwargs):
+        return self.request("PATCH", url_path, **kwargs)
+
+    def delete(self, url_path, **kwargs):
+        return self.request("DELETE", url_path, **kwargs)
+
+    def get_cached(self, url_path, params=None, ttl=0, cache=None):
+        """Return the decoded body of a GET, served from the response cache.
+
+        A cached response younger than ttl seconds is returned without any
+        request. An older one is revalidated with If-None-Match and
+        If-Modified-Since, and reused when the API answers 304. ttl=0
+        bypasses the cache altogether.
+        """
+        if not ttl:
+            response = self.get(url_path, params=params)
+            if not response.ok:
+                raise ApiError(f"Error querying {url_path}", response)
+            return response.json()
+
+        cache = cache or respcache.ResponseCache()
+        key = cache.key(self.url(url_path), params)
+        entry = cache.get(key)
+        if entry is not None and cache.age(entry) < ttl:
+            return entry["body"]
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.get(url_path, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            cache.touch(key)
+            return entry["body"]
+        if not response.ok:
+            raise ApiError(f"Error querying {url_path}", response)
+
+        body = response.json()
+        cache.put(key, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return body
+
+    def iter_pages(self, url_path, params=None, page_size=100, offset=0):
+        """Yield the items of a list endpoint, one offset/limit page at a time.
+
+        Only one page is held in memory at any time; iteration stops after
+        the first short page.
+        """
+        params = dict(params or {})
+        while True:
+            response = self.get(url_path, params=params | {"offset": offset, "limit": page_size})
+            if not response.ok:
+                raise ApiError(f"Error listing {url_path}", response)
+
+            items = response.json()
+            yield from items
+
+            if len(items) < page_size:
+                return
+            offset += len(items)
+
+    def iter_array(self, url_path, params=None):
+        """Yield the items of a list endpoint as they are decoded from the body.
+
+        The response is streamed and parsed incrementally, so only the item
+        being decoded is held in memory rather than the whole response.
+        """
+        response = self.get(url_path, params=params, stream=True)
+        try:
+            if not response.ok:
+                raise ApiError(f"Error listing {url_path}", response)
+            yield from jsonstream.IterArray(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+
+class ConnectionResponse:
+    """The subset of requests.Response the modules use, for a response relayed by the httpapi plugin."""
+
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.text = text
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1):
+        # The body already is in memory, only encode it a chunk at a time
+        # rather than keeping an encoded copy of all of it as well
+        for i in range(0, len(self.text), chunk_size):
+            yield self.text[i:i + chunk_size].encode("utf-8")
+
+    def close(self):
+        pass
+
+
+class ConnectionClient(ApiClient):
+    """ApiClient sending its requests through the httpapi persistent connection.
+
+    The token, session and connection pool are those of the connection,
+    which lives for the whole play. Requests to another host than the API,
+    and downloads made through direct(), are sent by a plain ApiClient
+    instead: relaying an ISO over the connection socket would hold it in
+    memory.
+
+    The connection relays whole response bodies, so streamed API responses
+    (iter_array) are held in memory once before being parsed incrementally.
+    """
+
+    def __init__(self, connection, base_url=apiurl.API_URL, retries=MAX_RETRIES, rate_limiter=None):
+        self.connection = connection
+        self.base_url = base_url.rstrip("/")
+        self.timeout = DEFAULT_TIMEOUT
+        self.retries = retries
+        self.rate_limiter = rate_limiter
+        # The connection renews the token itself
+        self.renew_token = False
+        self._direct = None
+
+    def direct(self):
+        if self._direct is None:
+            self._direct = ApiClient(base_url=self.base_url, retries=self.retries, rate_limiter=self.rate_limiter)
+        return self._direct
+
+    def _send(self, method, url, **kwargs):
+        parts = urlsplit(url)
+        base = urlsplit(self.base_url)
+        if (parts.scheme, parts.netloc) != (base.scheme, base.netloc):
+            return self.direct()._send(method, url, **kwargs)
+
+        # The connection knows the host, only send the path and query string
+        query = [q for q in (parts.query, urlencode(kwargs.get("params") or {})) if q]
+        path = parts.path + ("?" + "&".join(query) if query else "")
+
+        data = None if kwargs.get("json") is None else json.dumps(kwargs["json"])
+        return ConnectionResponse(**self.connection.send_request(method, path, data, kwargs.get("headers")))
+
+    def set_token(self, token):
+        # The connection authenticates the requests
+        pass
+
+    def close(self):
+        if self._direct is not None:
+            self._direct.close()
+
+
+def GetClient(module=None):
+    """Return the process-wide ApiClient, creating it on first use.
+
+    When module runs over the httpapi persistent connection, the client
+    sends its requests through that connection. Invalid AI_API_RATE or
+    AI_API_BURST values fail module, or raise ValueError without one.
+    """
+    global _client
+    if _client is None:
+        try:
+            rate_limiter = ratelimit.FromEnv()
+        except ValueError as e:
+            if module is None:
+                raise
+            module.fail_json(msg=str(e))
+
+        socket_path = getattr(module, "_socket_path", None)
+        if socket_path and HAS_CONNECTION:
+            _client = ConnectionClient(Connection(socket_path), rate_limiter=rate_limiter)
+        else:
+            _client = ApiClient(rate_limiter=rate_limiter)
+    return _client
+
+
+def BuildQuery(params, keys):
+    """Build API query parameters from the truthy values of params[keys].
+
+    Lists are sent comma separated, which is what the API expects for
+    multi-valued filters such as event severities.
+    """
+    query_params = {}
+    for k in keys:
+        val = params.get(k)
+        if val:
+            if isinstance(val, list):
+                query_params = query_params | {k: ",".join(val)}
+            else:
+                query_params = query_params | {k: val}
+    return query_params
+
+
+def ParseTime(timestamp):
+    """Parse an API timestamp such as 2024-11-08T20:15:44.447Z.
+
+    The API trims trailing zeros from the fractional seconds, so timestamps
+    can not be compared as strings.
+    """
+    timestamp = timestamp.replace("Z", "+00:00")
+    timestamp = _FRACTION_RE.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), timestamp, count=1)
+    return datetime.fromisoformat(timestamp)
+
+
+def RetryAfter(response):
+    """Return the seconds to wait according to the Retry-After header, None when absent or invalid.
+
+    The header holds either a number of seconds or an HTTP date.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def BackoffDelays(initial=1, maximum=60, factor=2):
+    """Yield exponentially growing delays, capped at maximum, with jitter.
+
+    Each delay is drawn between half and all of the current backoff step so
+    that concurrent pollers do not end up in lock step.
+    """
+    step = initial
+    while True:
+        yield step / 2 + random.uniform(0, step / 2)
+        step = min(step * factor, maximum)
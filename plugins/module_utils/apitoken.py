@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 import traceback
+import hashlib
 import os
+import time
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import localstate
+except ImportError:
+    from ansible.module_utils import localstate
 
 try:
     import requests
@@ -13,8 +20,20 @@ else:
 
 URL = "https://sso.redhat.com/auth/realms/redhat-external/protocol/openid-connect/token"
 
+# Refresh the access token this many seconds before it actually expires so
+# that a token handed out to a module does not expire mid-run.
+REFRESH_MARGIN = 60
+
+# Seconds to wait for the SSO token endpoint
+TIMEOUT = 30
+
 
 def _get_refresh_token(offline_token):
+    """Exchange the offline token for an access token.
+
+    Returns a tuple of (access_token, expires_in), access_token is None when
+    the exchange failed.
+    """
     # Set headers
     headers = {
         'Content-Type': 'application/x-www-form-urlencoded',
@@ -28,13 +47,69 @@ def _get_refresh_token(offline_token):
     }
 
     # Generate API token
-    response = requests.post(f"{URL}", data=data, headers=headers)
-    if 'access_token' in response.json():
-        return response.json()['access_token']
+    response = requests.post(f"{URL}", data=data, headers=headers, timeout=TIMEOUT)
+    token = response.json()
+    if 'access_token' in token:
+        return token['access_token'], token.get('expires_in', 0)
+
+    return None, 0
+
+
+def _cache_path(offline_token):
+    # Key the cache on a digest of the offline token so that switching
+    # accounts never hands out another account's access token, and the
+    # offline token itself is never written to disk.
+    digest = hashlib.sha256(offline_token.encode("utf-8")).hexdigest()[:32]
+    return localstate.GetCacheDir(f"token-{digest}.json")
+
+
+def _read_cached_token(path):
+    cached = localstate.ReadJSON(path, {})
+    if cached.get("expires_at", 0) - REFRESH_MARGIN > time.time():
+        return cached.get("access_token")
 
     return None
 
 
+def _get_cached_token(offline_token):
+    """Return an access token from the on-disk cache, refreshing it if needed.
+
+    Concurrent forks serialize on an exclusive lock; the first one refreshes
+    the token and the others reuse it once they obtain the lock, so a task
+    running on many hosts performs a single SSO round trip.
+    """
+    path = _cache_path(offline_token)
+
+    # Fast path, no locking needed for a fresh token
+    token = _read_cached_token(path)
+    if token:
+        return token
+
+    lock = localstate.FileLock(path + ".lock")
+    try:
+        lock.acquire()
+    except OSError:
+        # The cache is an optimization, carry on without it when the cache
+        # directory is not writable
+        return _get_refresh_token(offline_token)[0]
+
+    try:
+        # Another fork may have refreshed the token while we waited
+        token = _read_cached_token(path)
+        if token:
+            return token
+
+        token, expires_in = _get_refresh_token(offline_token)
+        if token and expires_in:
+            try:
+                localstate.WriteJSON(path, {"access_token": token, "expires_at": time.time() + expires_in})
+            except OSError:
+                pass
+        return token
+    finally:
+        lock.release()
+
+
 def GetToken():
     token = os.environ.get('AI_API_TOKEN')
     if token:
@@ -42,6 +117,6 @@ def GetToken():
 
     offline_token = os.environ.get('AI_OFFLINE_TOKEN')
     if offline_token:
-        return _get_refresh_token(offline_token)
+        return _get_cached_token(offline_token)
 
     return None
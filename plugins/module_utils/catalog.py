@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient
+except ImportError:
+    from ansible.module_utils import apiclient
+
+# add additional query parameters to the query params lists
+OPENSHIFT_VERSIONS_QUERY_PARAMS = [
+    "version",
+    "only_latest",
+]
+
+SUPPORT_LEVELS_QUERY_PARAMS = {"architectures": ["openshift_version"],
+                               "features": ["openshift_version", "cpu_architecture", "platform_type", "external_platform_name"]}
+
+
+def GetOpenShiftVersions(client, params, ttl=0):
+    query_params = apiclient.BuildQuery(params, OPENSHIFT_VERSIONS_QUERY_PARAMS)
+    return client.get_cached("/openshift-versions", params=query_params, ttl=ttl)
+
+
+def GetSupportLevels(client, resource_type, params, ttl=0):
+    query_params = apiclient.BuildQuery(params, SUPPORT_LEVELS_QUERY_PARAMS[resource_type])
+    return client.get_cached(f"/support-levels/{resource_type}", params=query_params, ttl=ttl)
+
+
+def GetSupportedOperators(client, ttl=0):
+    return client.get_cached("/supported-operators", ttl=ttl)
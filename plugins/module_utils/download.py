@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import re
+import time
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient
+except ImportError:
+    from ansible.module_utils import apiclient
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import fanout
+except ImportError:
+    from ansible.module_utils import fanout
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import localstate
+except ImportError:
+    from ansible.module_utils import localstate
+
+try:
+    import requests
+except ImportError:
+    # apiclient.HAS_REQUESTS reports it
+    pass
+
+# Size of the chunks streamed to disk and hashed
+CHUNK_SIZE = 1024 * 1024
+
+# Number of times an interrupted download is resumed before giving up
+RETRIES = 5
+
+# Number of concurrent ranged requests a large download is split into
+SEGMENTS = 4
+
+# Files smaller than this are downloaded over a single connection
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+
+class DownloadError(Exception):
+    """Raised when a download can not be completed or verified."""
+
+
+def ParseChecksum(checksum):
+    """Split "<algorithm>:<hex digest>" into its parts, sha256 by default."""
+    algorithm, sep, digest = checksum.rpartition(":")
+    if not sep:
+        algorithm = "sha256"
+    if algorithm not in hashlib.algorithms_available:
+        raise DownloadError(f"Unsupported checksum algorithm: {algorithm}")
+    return algorithm, digest.lower()
+
+
+def FileDigest(path, algorithm="sha256", digest=None):
+    """Hash the content of path, into digest when given."""
+    digest = digest or hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest
+
+
+def Head(client, url):
+    """Return the headers of url from a HEAD request, None when it fails."""
+    try:
+        response = client.request("HEAD", url, headers={"Accept": "*/*"}, allow_redirects=True)
+    except requests.RequestException:
+        return None
+    if not response.ok:
+        return None
+    return response.headers
+
+
+def RemoteInfo(client, url, headers=None):
+    """Return the size of url and whether it can be fetched by ranges, from a HEAD request.
+
+    headers are those of a HEAD request of url the caller already made, a
+    new one is only sent without them. The size is None when it is unknown.
+    """
+    if headers is None:
+        headers = Head(client, url)
+    if headers is None or "Content-Length" not in headers:
+        return None, False
+    return int(headers["Content-Length"]), headers.get("Accept-Ranges") == "bytes"
+
+
+def _total_size(response, offset):
+    if response.status_code == 206:
+        match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+        return int(match.group(1)) if match else None
+    if "Content-Length" in response.headers:
+        return offset + int(response.headers["Content-Length"])
+    return None
+
+
+def _download_segment(client, url, fd, start, end, chunk_size, retries):
+    """Write bytes start to end (inclusive) of url at the same offsets of fd."""
+    position = start
+    attempts = 0
+    delays = apiclient.BackoffDelays()
+    while True:
+        try:
+            response = client.get(url, headers={"Accept": "*/*", "Range": f"bytes={position}-{end}"}, stream=True)
+            try:
+                if response.status_code != 206:
+                    raise apiclient.ApiError(f"Error downloading {url}", response)
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    os.pwrite(fd, chunk, position)
+                    position += len(chunk)
+            finally:
+                response.close()
+
+            if position > end:
+                return end + 1 - start
+            error = f"connection closed at byte {position} of segment {start}-{end}"
+        except requests.RequestException as e:
+            error = str(e)
+
+        attempts += 1
+        if attempts > retries:
+            raise DownloadError(f"Error downloading {url}: {error}")
+        time.sleep(next(delays))
+
+
+def _parallel_download(client, url, part, size, segments, chunk_size, retries):
+    """Download url to part over segments concurrent ranged requests.
+
+    The segments are written to a separate .segments file which is only
+    renamed to part once every segment is complete: it is preallocated to
+    the full size, so it must never be mistaken for a resumable .part.
+    """
+    step = -(-size // segments)
+    ranges = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+    tmp = os.path.splitext(part)[0] + ".segments"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(fd, size)
+        outcomes = fanout.Map(
+            lambda r: _download_segment(client, url, fd, r[0], r[1], chunk_size, retries), ranges, segments
+        )
+    finally:
+        os.close(fd)
+
+    for outcome in outcomes:
+        if not outcome.ok:
+            os.unlink(tmp)
+            raise outcome.error
+    os.replace(tmp, part)
+
+
+def _validator(headers):
+    """Return the If-Range validator of a response, None when it has none.
+
+    Weak ETags can not be used with If-Range, Last-Modified is used instead.
+    """
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _stream_download(client, url, part, digest, chunk_size, retries):
+    """Download url to part over one connection, resuming part when it exists.
+
+    The url and validator (ETag or Last-Modified) of the response are kept
+    in part.json. A .part is only resumed for the same url and with
+    If-Range, so that the server sends the whole file again instead of the
+    rest of it when it changed since.
+
+    Returns the digest of the whole file, its size and the offset the
+    download resumed from.
+    """
+    meta_path = part + ".json"
+    meta = localstate.ReadJSON(meta_path, {})
+    validator = meta.get("validator")
+
+    offset = 0
+    if os.path.exists(part) and meta.get("url") == url and validator:
+        FileDigest(part, digest=digest)
+        offset = os.path.getsize(part)
+    resumed_from = offset
+
+    attempts = 0
+    delays = apiclient.BackoffDelays()
+    while True:
+        headers = {"Accept": "*/*"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+
+        try:
+            response = client.get(url, headers=headers, stream=True)
+            try:
+                # The .part already holds the whole file
+                if response.status_code == 416 and offset:
+                    break
+                if not response.ok:
+                    raise apiclient.ApiError(f"Error downloading {url}", response)
+
+                if offset and response.status_code != 206:
+                    # The file changed or the server ignored the range, start over
+                    offset = resumed_from = 0
+                    digest = hashlib.new(digest.name)
+                if not offset:
+                    validator = _validator(response.headers)
+                    localstate.WriteJSON(meta_path, dict(url=url, validator=validator))
+
+                total = _total_size(response, offset)
+                with open(part, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        offset += len(chunk)
+            finally:
+                response.close()
+
+            if total is None or offset >= total:
+                break
+            error = f"connection closed after {offset} of {total} bytes"
+        except requests.RequestException as e:
+            error = str(e)
+
+        attempts += 1
+        if attempts > retries:
+            raise DownloadError(f"Error downloading {url}: {error}")
+        time.sleep(next(delays))
+
+    return digest, offset, resumed_from
+
+
+def Download(client, url, dest, checksum=None, chunk_size=CHUNK_SIZE, retries=RETRIES, segments=SEGMENTS,
+             head=None):
+    """Stream url to dest, resuming with HTTP Range requests after failures.
+
+    The body is written to dest.part in chunk_size pieces and hashed on the
+    fly, a .part left over by an interrupted run is resumed rather than
+    downloaded again as long as the server reports the same file. Files of at least PARALLEL_MIN_SIZE bytes served with
+    range support are instead split into segments fetched concurrently, each
+    segment resuming on its own within the run; an interrupted segmented
+    download starts over. dest is only replaced once the download is
+    complete and matches checksum ("<algorithm>:<hex digest>", sha256 by
+    default).
+
+    Nothing is downloaded when dest already matches checksum or, without
+    checksum, the size the server reports. head are the headers of a HEAD
+    request of url when the caller already made one.
+    """
+    algorithm, expected = ParseChecksum(checksum) if checksum else ("sha256", None)
+    started = time.monotonic()
+    # Never relay the ISO through a persistent connection
+    client = client.direct()
+
+    exists = os.path.exists(dest)
+    if exists and expected and FileDigest(dest, algorithm).hexdigest() == expected:
+        return dict(changed=False, dest=dest, size=os.path.getsize(dest))
+
+    size, ranges = None, False
+    if segments > 1 or (exists and not expected):
+        size, ranges = RemoteInfo(client, url, head)
+        if exists and not expected and size == os.path.getsize(dest):
+            return dict(changed=False, dest=dest, size=size)
+
+    part = dest + ".part"
+    if segments > 1 and ranges and size >= PARALLEL_MIN_SIZE and not os.path.exists(part):
+        _parallel_download(client, url, part, size, segments, chunk_size, retries)
+        digest, resumed_from = FileDigest(part, algorithm), 0
+    else:
+        segments = 1
+        digest, size, resumed_from = _stream_download(
+            client, url, part, hashlib.new(algorithm), chunk_size, retries
+        )
+
+    if os.path.exists(part + ".json"):
+        os.unlink(part + ".json")
+
+    actual = digest.hexdigest()
+    if expected and actual != expected:
+        os.unlink(part)
+        raise DownloadError(f"Checksum mismatch for {url}: expected {expected}, got {actual}")
+    os.replace(part, dest)
+
+    elapsed = time.monotonic() - started
+    transferred = size - resumed_from
+    return dict(
+        changed=True,
+        dest=dest,
+        size=size,
+        checksum=f"{algorithm}:{actual}",
+        resumed_from=resumed_from,
+        transferred=transferred,
+        segments=segments,
+        elapsed=round(elapsed, 3),
+        throughput=int(transferred / elapsed) if elapsed else None,
+    )
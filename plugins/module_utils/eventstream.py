@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import heapq
+import time
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient, localstate
+except ImportError:
+    from ansible.module_utils import apiclient, localstate
+
+
+def EventKey(event):
+    """Identify an event among the ones sharing the same event_time."""
+    key = "|".join(str(event.get(k, "")) for k in ("name", "host_id", "infra_env_id", "message"))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+class EventStream:
+    """Iterate over cluster events page by page.
+
+    Pages of page_size events are requested from /events starting at offset
+    and yielded one event at a time. Iteration stops once limit events have
+    been yielded, once timeout seconds have elapsed (checked between pages),
+    or when the API runs out of events. truncated tells whether the stream
+    stopped on limit/timeout rather than because the API ran out of events.
+    """
+
+    def __init__(self, client, query_params, page_size=100, offset=0, limit=None, timeout=None):
+        self.client = client
+        self.query_params = query_params
+        self.page_size = page_size
+        self.offset = offset
+        self.limit = limit
+        self.timeout = timeout
+        self.truncated = False
+
+    def __iter__(self):
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        page_size = self.page_size
+        if self.limit:
+            page_size = min(page_size, self.limit)
+
+        for count, event in enumerate(self.client.iter_pages("/events", self.query_params, page_size, self.offset), 1):
+            yield event
+
+            if self.limit and count >= self.limit:
+                self.truncated = True
+                return
+            # Only check the clock at page boundaries, a page is always
+            # returned in full once it has been fetched
+            if deadline and count % page_size == 0 and time.monotonic() >= deadline:
+                self.truncated = True
+                return
+
+
+def MergeEvents(streams, descending=False):
+    """Merge event streams that are each sorted by event_time.
+
+    The streams are merged lazily with a heap, so merging k streams costs
+    O(log k) per event and never sorts the concatenated events.
+    """
+    return heapq.merge(*streams, key=lambda event: apiclient.ParseTime(event["event_time"]), reverse=descending)
+
+
+class EventSummary:
+    """Aggregate events as they are retrieved.
+
+    Counts events by severity and name, tracks the first and last event
+    times, the latest cluster status change and the last errors, without
+    keeping the events themselves.
+    """
+
+    ERROR_SEVERITIES = ("error", "critical")
+    STATUS_EVENT = "cluster_status_updated"
+
+    def __init__(self, errors=10):
+        self.total = 0
+        self.by_severity = {}
+        self.by_name = {}
+        self.first = None
+        self.last = None
+        self.last_status_update = None
+        # min-heap of the latest errors, whatever the retrieval order
+        self.errors = errors
+        self.last_errors = []
+
+    def _is_later(self, event, than):
+        return than is None or apiclient.ParseTime(event["event_time"]) >= apiclient.ParseTime(than["event_time"])
+
+    def add(self, event):
+        self.total += 1
+        severity = event.get("severity")
+        name = event.get("name")
+        self.by_severity[severity] = self.by_severity.get(severity, 0) + 1
+        self.by_name[name] = self.by_name.get(name, 0) + 1
+
+        if self.first is None or apiclient.ParseTime(event["event_time"]) < apiclient.ParseTime(self.first["event_time"]):
+            self.first = event
+        if self._is_later(event, self.last):
+            self.last = event
+        if name == self.STATUS_EVENT and self._is_later(event, self.last_status_update):
+            self.last_status_update = event
+        if severity in self.ERROR_SEVERITIES and self.errors > 0:
+            entry = (apiclient.ParseTime(event["event_time"]), self.total, event)
+            if len(self.last_errors) < self.errors:
+                heapq.heappush(self.last_errors, entry)
+            else:
+                heapq.heappushpop(self.last_errors, entry)
+
+    def result(self):
+        last_errors = [event for event_time, seq, event in sorted(self.last_errors)]
+        return {
+            "total": self.total,
+            "by_severity": self.by_severity,
+            "by_name": self.by_name,
+            "first_event_time": self.first["event_time"] if self.first else None,
+            "last_event_time": self.last["event_time"] if self.last else None,
+            "last_status_update": self.last_status_update,
+            "last_errors": last_errors,
+        }
+
+
+class EventCursors:
+    """Per cluster position in the event history, persisted between runs.
+
+    A cursor records how many events were consumed (the offset of the next
+    unseen event in ascending order), the event_time of the last consumed
+    event and the keys of the events seen at that exact time. The offset lets
+    the next run skip known events server side, the time and keys guard
+    against the offset drifting when events are pruned.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def get(self, key):
+        return localstate.ReadJSON(self.path, {}).get(key, {})
+
+    def update(self, key, cursor):
+        # Other forks may be updating the cursors of other clusters
+        with localstate.FileLock(self.path + ".lock"):
+            cursors = localstate.ReadJSON(self.path, {})
+            cursors[key] = cursor
+            localstate.WriteJSON(self.path, cursors)
+
+
+class FollowStream:
+    """Yield the events that are newer than cursor, then advance it.
+
+    The events are requested in ascending order starting at the cursor
+    offset, the cursor itself is only updated in memory; it is up to the
+    caller to persist it once the events were handled.
+    """
+
+    def __init__(self, client, query_params, cursor, page_size=100, limit=None, timeout=None):
+        self.cursor = dict(cursor)
+        self.stream = EventStream(
+            client,
+            query_params | {"order": "ascending"},
+            page_size=page_size,
+            offset=self.cursor.get("offset", 0),
+            limit=limit,
+            timeout=timeout,
+        )
+
+    @property
+    def truncated(self):
+        return self.stream.truncated
+
+    def __iter__(self):
+        last_time = self.cursor.get("event_time")
+        last_time = apiclient.ParseTime(last_time) if last_time else None
+        seen = set(self.cursor.get("seen", []))
+        offset = self.cursor.get("offset", 0)
+
+        for event in self.stream:
+            offset += 1
+            self.cursor["offset"] = offset
+
+            event_time = apiclient.ParseTime(event["event_time"])
+            key = EventKey(event)
+            if last_time is not None:
+                if event_time < last_time or (event_time == last_time and key in seen):
+                    continue
+
+            if last_time is None or event_time > last_time:
+                last_time = event_time
+                seen = set()
+            seen.add(key)
+            self.cursor["event_time"] = event["event_time"]
+            self.cursor["seen"] = sorted(seen)
+
+            yield event
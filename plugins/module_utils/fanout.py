@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+
+# Default number of concurrent API calls, keep it below apiclient.POOL_MAXSIZE
+# so that every worker gets a pooled connection.
+DEFAULT_WORKERS = 8
+
+
+class Outcome:
+    """Result of calling func on one item, error is the raised exception."""
+
+    def __init__(self, item, result=None, error=None):
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _call(func, item):
+    try:
+        return Outcome(item, result=func(item))
+    except Exception as e:
+        return Outcome(item, error=e)
+
+
+def Map(func, items, workers=DEFAULT_WORKERS):
+    """Call func on every item over at most workers threads.
+
+    Returns one Outcome per item, in input order. A failing item does not
+    abort the others, its exception is recorded in its Outcome instead.
+    """
+    items = list(items)
+    if len(items) <= 1 or workers <= 1:
+        return [_call(func, item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(lambda item: _call(func, item), items))
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import download, localstate
+except ImportError:
+    from ansible.module_utils import download, localstate
+
+# Maximum size of the cached ISOs, the least recently used ones are evicted
+MAX_BYTES = 10 * 1024 * 1024 * 1024
+
+
+def ImageKey(infra_env):
+    """Return the cache key of the discovery ISO of infra_env."""
+    return "-".join([
+        infra_env.get("openshift_version") or "",
+        infra_env.get("cpu_architecture") or "",
+        infra_env.get("type") or "",
+    ])
+
+
+class IsoCache:
+    """Controller-local cache of discovery ISOs, shared by every infra-env.
+
+    ISOs are stored once under their sha256 digest (blobs/<sha256>) and an
+    index maps image keys to digests, along with the size and ETag the
+    server reported, so that identical ISOs are only kept once whatever the
+    number of keys pointing at them. The total size of the
+    blobs is kept under max_bytes by evicting the least recently used ones.
+    """
+
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = directory or localstate.GetCacheDir("isos")
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.directory, "index.json")
+
+    def _blob(self, digest):
+        return os.path.join(self.directory, "blobs", digest)
+
+    def get(self, key):
+        """Return the index entry (digest, size, etag) and path of the ISO cached under key, or (None, None)."""
+        entry = localstate.ReadJSON(self.index_path, {}).get(key)
+        if not isinstance(entry, dict):
+            return None, None
+
+        path = self._blob(entry["digest"])
+        try:
+            # Mark it as recently used
+            os.utime(path)
+        except OSError:
+            return None, None
+        return entry, path
+
+    def put(self, key, path, digest, etag=None):
+        """Store a copy of the ISO at path, whose sha256 is digest, under key."""
+        blob = self._blob(digest)
+        os.makedirs(os.path.dirname(blob), mode=0o700, exist_ok=True)
+
+        with localstate.FileLock(self.index_path + ".lock"):
+            if not os.path.exists(blob):
+                Materialize(path, blob)
+
+            index = localstate.ReadJSON(self.index_path, {})
+            index[key] = dict(digest=digest, size=os.path.getsize(blob), etag=etag)
+            self._evict(index, keep=digest)
+            localstate.WriteJSON(self.index_path, index)
+
+    def _evict(self, index, keep):
+        directory = os.path.dirname(self._blob(keep))
+        blobs = []
+        for name in os.listdir(directory):
+            st = os.stat(os.path.join(directory, name))
+            blobs.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in blobs)
+        for _, size, name in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                continue
+            total -= size
+            for key in [k for k, v in index.items() if isinstance(v, dict) and v.get("digest") == name]:
+                del index[key]
+
+
+def Materialize(src, dest):
+    """Make dest a copy of src.
+
+    dest is never a hard link to src: the ISO may be modified in place (for
+    instance with coreos-installer iso ignition embed), which must not alter
+    the cached copy other infra-envs get.
+    """
+    tmp = dest + ".tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+def _fresh(entry, headers):
+    """Tell whether the ISO behind headers, from a HEAD request, is the cached one.
+
+    Discovery ISOs embed the ignition, SSH key and proxy of their infra-env,
+    whatever their image key: only a strong ETag identical to the cached
+    one tells that it is the same file, equal sizes do not.
+    """
+    etag = headers.get("ETag")
+    if not etag or etag.startswith("W/") or etag != entry.get("etag"):
+        return False
+    if "Content-Length" in headers and int(headers["Content-Length"]) != entry.get("size"):
+        return False
+    return True
+
+
+def CachedDownload(client, url, dest, key, cache, checksum=None, **kwargs):
+    """Download url to dest through cache, see download.Download.
+
+    The ISO cached under key is copied to dest when it matches checksum or,
+    without checksum, when a HEAD request of url reports the same strong
+    ETag and size as when it was cached. Otherwise the ISO is downloaded
+    and added to the cache.
+    """
+    client = client.direct()
+    entry, blob = cache.get(key)
+
+    headers = None
+    if blob is not None and checksum:
+        # The checksum identifies the ISO, whatever infra-env it was cached for
+        algorithm, expected = download.ParseChecksum(checksum)
+        actual = entry["digest"] if algorithm == "sha256" else download.FileDigest(blob, algorithm).hexdigest()
+        if actual != expected:
+            blob = None
+    elif blob is not None:
+        headers = download.Head(client, url) or {}
+        if not _fresh(entry, headers):
+            blob = None
+
+    if blob is not None:
+        digest = entry["digest"]
+        if os.path.exists(dest) and os.path.getsize(dest) == entry["size"] \
+                and download.FileDigest(dest).hexdigest() == digest:
+            return dict(changed=False, dest=dest, size=entry["size"], cached=True)
+        Materialize(blob, dest)
+        return dict(changed=True, dest=dest, size=entry["size"], checksum=f"sha256:{digest}", cached=True)
+
+    # One HEAD request tells both the ETag to cache and how to download
+    if headers is None:
+        headers = download.Head(client, url) or {}
+    result = download.Download(client, url, dest, checksum=checksum, head=headers, **kwargs)
+
+    algorithm, _, digest = (result.get("checksum") or "").partition(":")
+    if algorithm != "sha256":
+        digest = download.FileDigest(dest).hexdigest()
+    cache.put(key, dest, digest, etag=headers.get("ETag"))
+
+    return result | dict(cached=False)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import codecs
+import json
+import re
+
+# Next character that opens or closes a value or starts a string
+_STRUCTURE_RE = re.compile(r'[\[\]{}"]')
+
+# Rest of a string once its opening quote is consumed
+_STRING_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+# End of a number, true, false or null
+_SCALAR_END_RE = re.compile(r"[,\]\s]")
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Scanner:
+    """Buffer of decoded text the elements of a JSON array are cut from."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk to the buffer, return False at the end of the input."""
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buffer += self.decoder.decode(b"", final=True)
+            return False
+        if isinstance(chunk, bytes):
+            chunk = self.decoder.decode(chunk)
+        # Drop what was already consumed so the buffer only holds one element
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expecting '{char}' at offset {self.pos} of the JSON input")
+        self.pos += 1
+
+    def value_end(self):
+        """Return the end offset of the object, array, string or scalar at pos."""
+        start = self.pos
+        first = self.buffer[start]
+        if first not in '[{"':
+            # Scalar: it ends at the next separator
+            while True:
+                match = _SCALAR_END_RE.search(self.buffer, start)
+                if match:
+                    return match.start()
+                if not self.fill():
+                    return len(self.buffer)
+                start = self.pos
+
+        depth = 0
+        scan = start
+        while True:
+            match = _STRUCTURE_RE.search(self.buffer, scan)
+            if match is None:
+                scan = len(self.buffer)
+            elif match.group() == '"':
+                string = _STRING_RE.match(self.buffer, match.end())
+                if string is None:
+                    # The string continues in the next chunk
+                    scan = match.start()
+                else:
+                    scan = string.end()
+                    if depth == 0:
+                        return scan
+                    continue
+            else:
+                scan = match.end()
+                depth += 1 if match.group() in "[{" else -1
+                if depth == 0:
+                    return scan
+                continue
+
+            offset = scan - self.pos
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON input")
+            scan = self.pos + offset
+
+
+def IterArray(chunks):
+    """Yield the decoded elements of the JSON array read from chunks.
+
+    chunks is any iterable of bytes or text, for instance
+    response.iter_content(). Each element is decoded on its own as soon as
+    it is complete, so memory use is bounded by the largest element rather
+    than by the whole document.
+    """
+    scanner = _Scanner(chunks)
+    scanner.expect("[")
+    if scanner.peek() == "]":
+        return
+
+    while True:
+        scanner.peek()
+        end = scanner.value_end()
+        yield json.loads(scanner.buffer[scanner.pos:end])
+        scanner.pos = end
+
+        if scanner.peek() == "]":
+            return
+        scanner.expect(",")
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    HAS_FCNTL = False
+else:
+    HAS_FCNTL = True
+
+# Directory holding the state kept between module runs (token cache, event
+# cursors, snapshots...), override with AI_CACHE_DIR
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "assisted_installer")
+
+
+def GetCacheDir(*parts):
+    return os.path.join(os.environ.get('AI_CACHE_DIR', CACHE_DIR), *parts)
+
+
+class FileLock:
+    """Exclusive advisory lock on path, shared by every fork on the host.
+
+    On platforms without fcntl the lock is a no-op.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        self.lock = open(self.path, "a")
+        os.chmod(self.path, 0o600)
+        if HAS_FCNTL:
+            fcntl.flock(self.lock, fcntl.LOCK_EX)
+
+    def release(self):
+        if HAS_FCNTL:
+            fcntl.flock(self.lock, fcntl.LOCK_UN)
+        self.lock.close()
+        self.lock = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def ReadJSON(path, default=None):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def WriteJSON(path, data):
+    """Write data to path as JSON, readable by the current user only.
+
+    The data goes to a temporary file renamed in place so that a concurrent
+    reader never sees a partially written file.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
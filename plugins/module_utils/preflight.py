@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import catalog
+except ImportError:
+    from ansible.module_utils import catalog
+
+# Support levels a cluster can not be registered with
+UNSUPPORTED_LEVELS = ["unavailable", "unsupported"]
+
+# cpu_architecture to support-levels/architectures feature
+ARCHITECTURE_FEATURES = {
+    "x86_64": "X86_64_ARCHITECTURE",
+    "aarch64": "ARM64_ARCHITECTURE",
+    "arm64": "ARM64_ARCHITECTURE",
+    "ppc64le": "PPC64LE_ARCHITECTURE",
+    "s390x": "S390X_ARCHITECTURE",
+    "multi": "MULTIARCH_RELEASE_IMAGE",
+}
+
+
+class Preflight:
+    """Validate cluster registration payloads against the API catalogs.
+
+    The catalogs (OpenShift versions, supported operators and support
+    levels) are read through the response cache with the given ttl, so a
+    fresh snapshot validates payloads without any network call. Catalogs are
+    loaded once per instance and shared by every payload checked.
+    """
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+        self._versions = None
+        self._operators = None
+        self._support_levels = {}
+
+    @property
+    def versions(self):
+        if self._versions is None:
+            self._versions = catalog.GetOpenShiftVersions(self.client, {}, ttl=self.ttl)
+        return self._versions
+
+    @property
+    def operators(self):
+        if self._operators is None:
+            self._operators = catalog.GetSupportedOperators(self.client, ttl=self.ttl)
+        return self._operators
+
+    def load(self):
+        """Retrieve the catalogs shared by every payload."""
+        return self.versions, self.operators
+
+    def support_levels(self, resource_type, **params):
+        key = (resource_type,) + tuple(sorted(params.items()))
+        if key not in self._support_levels:
+            levels = catalog.GetSupportLevels(self.client, resource_type, params, ttl=self.ttl)
+            self._support_levels[key] = levels.get(resource_type, {})
+        return self._support_levels[key]
+
+    def match_versions(self, openshift_version):
+        """Return the catalog entries openshift_version designates.
+
+        A version matches its exact release (4.16.19), its display name or,
+        for a major.minor version (4.16), any release of that minor.
+        """
+        return [
+            details for release, details in self.versions.items()
+            if openshift_version in (release, details.get("display_name"))
+            or release.startswith(openshift_version + ".")
+        ]
+
+    def check(self, data):
+        """Return the reasons why data can not be registered, if any."""
+        openshift_version = data.get("openshift_version")
+        cpu_architecture = data.get("cpu_architecture") or "x86_64"
+
+        matches = self.match_versions(openshift_version)
+        if not matches:
+            return [f"openshift_version {openshift_version} is not supported, supported versions are: "
+                    f"{', '.join(sorted(self.versions))}"]
+
+        errors = []
+
+        architectures = set()
+        for details in matches:
+            architectures.update(details.get("cpu_architectures", []))
+            # Multi-architecture releases are listed as <version>-multi
+            if details.get("display_name", "").endswith("-multi"):
+                architectures.add("multi")
+        if "arm64" in architectures:
+            architectures.add("aarch64")
+        if cpu_architecture not in architectures:
+            errors.append(f"cpu_architecture {cpu_architecture} is not available for openshift_version "
+                          f"{openshift_version}, available architectures are: {', '.join(sorted(architectures))}")
+
+        level = self.support_levels(
+            "architectures", openshift_version=openshift_version
+        ).get(ARCHITECTURE_FEATURES.get(cpu_architecture))
+        if level in UNSUPPORTED_LEVELS:
+            errors.append(f"cpu_architecture {cpu_architecture} is {level} for openshift_version {openshift_version}")
+
+        feature_params = dict(openshift_version=openshift_version, cpu_architecture=cpu_architecture)
+        platform_type = (data.get("platform") or {}).get("type")
+        if platform_type:
+            feature_params["platform_type"] = platform_type
+        features = self.support_levels("features", **feature_params)
+
+        if data.get("high_availability_mode") == "None" and features.get("SNO") in UNSUPPORTED_LEVELS:
+            errors.append(f"single node clusters are {features['SNO']} for openshift_version {openshift_version} "
+                          f"on {cpu_architecture}")
+
+        for operator in data.get("olm_operators") or []:
+            name = operator.get("name")
+            if name not in self.operators:
+                errors.append(f"operator {name} is not supported, supported operators are: {', '.join(self.operators)}")
+            elif features.get(name.upper()) in UNSUPPORTED_LEVELS:
+                errors.append(f"operator {name} is {features[name.upper()]} for openshift_version {openshift_version} "
+                              f"on {cpu_architecture}")
+
+        return errors
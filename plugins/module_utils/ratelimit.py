@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import math
+import os
+import time
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import localstate
+except ImportError:
+    from ansible.module_utils import localstate
+
+
+class RateLimiter:
+    """Token bucket shared by every fork and thread on the host.
+
+    The bucket holds up to burst tokens and is refilled with rate tokens per
+    second; every request takes one token. Its state lives in a JSON file
+    updated under a file lock, so that concurrent Ansible forks stay under
+    rate requests per second together rather than each on its own.
+    """
+
+    def __init__(self, rate, burst=None, path=None):
+        if not (math.isfinite(rate) and rate > 0):
+            raise ValueError(f"The request rate must be a positive number of requests per second, got {rate}")
+        if burst is not None and burst < 1:
+            raise ValueError(f"The request burst must be a positive number of requests, got {burst}")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.path = path or localstate.GetCacheDir("ratelimit.json")
+
+    def _take(self):
+        """Take a token, return 0 on success or the seconds to wait for one."""
+        # One FileLock per call, the instance is shared by the fanout threads
+        with localstate.FileLock(self.path + ".lock"):
+            now = time.time()
+            state = localstate.ReadJSON(self.path, {})
+            elapsed = max(0, now - state.get("updated", now))
+            tokens = min(self.burst, state.get("tokens", self.burst) + elapsed * self.rate)
+
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            localstate.WriteJSON(self.path, dict(tokens=tokens, updated=now))
+        return wait
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+def FromEnv():
+    """Return the RateLimiter configured by AI_API_RATE and AI_API_BURST, None when unset.
+
+    Raises ValueError naming the variable when either is not a positive number.
+    """
+    rate = os.environ.get("AI_API_RATE")
+    if not rate:
+        return None
+    burst = os.environ.get("AI_API_BURST")
+
+    try:
+        rate_value = float(rate)
+        if not (math.isfinite(rate_value) and rate_value > 0):
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"AI_API_RATE must be a positive number of requests per second, got {rate!r}") from None
+    try:
+        burst_value = int(burst) if burst else None
+        if burst_value is not None and burst_value < 1:
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"AI_API_BURST must be a positive integer, got {burst!r}") from None
+
+    return RateLimiter(rate_value, burst_value)
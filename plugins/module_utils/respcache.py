@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import time
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import localstate
+except ImportError:
+    from ansible.module_utils import localstate
+
+# Maximum number of responses kept, the least recently used ones are evicted
+MAX_ENTRIES = 256
+
+
+class ResponseCache:
+    """Controller-local cache of API responses, one JSON file per response.
+
+    Entries are keyed by URL and query parameters and hold the decoded body
+    along with the ETag/Last-Modified validators the API returned, so that an
+    expired entry can be revalidated with a conditional request instead of
+    being downloaded again.
+    """
+
+    def __init__(self, directory=None, max_entries=MAX_ENTRIES):
+        self.directory = directory or localstate.GetCacheDir("responses")
+        self.max_entries = max_entries
+
+    def key(self, url, params=None):
+        data = json.dumps([url, params or {}], sort_keys=True)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the entry stored under key, or None."""
+        entry = localstate.ReadJSON(self._path(key))
+        if entry is not None:
+            self.touch(key, refresh=False)
+        return entry
+
+    def age(self, entry):
+        return time.time() - entry.get("stored_at", 0)
+
+    def put(self, key, body, etag=None, last_modified=None):
+        entry = dict(body=body, etag=etag, last_modified=last_modified, stored_at=time.time())
+        try:
+            localstate.WriteJSON(self._path(key), entry)
+            self._evict()
+        except OSError:
+            # The cache is an optimization, never fail a request because of it
+            pass
+
+    def touch(self, key, refresh=True):
+        """Mark key as recently used, refresh also restarts its TTL."""
+        path = self._path(key)
+        try:
+            if refresh:
+                entry = localstate.ReadJSON(path)
+                if entry is not None:
+                    entry["stored_at"] = time.time()
+                    localstate.WriteJSON(path, entry)
+            else:
+                os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        # The modification time of an entry is its last use
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort()
+        for mtime, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import operator
+import re
+
+# <major>.<minor>[.<patch>][-<prerelease>][-multi], e.g. 4.18.1, 4.19.0-ec.3,
+# 4.18.1-multi or 4.19.0-rc.2-multi
+_VERSION_RE = re.compile(r"^(\d+)\.(\d+)(?:\.(\d+))?(?:-(?!multi$)(.+?))?(-multi)?$")
+
+_CONSTRAINT_RE = re.compile(r"^(>=|<=|==|!=|>|<|=)?\s*(\S+)$")
+
+_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class Version:
+    """A parsed OpenShift release name, ordered by semantic version."""
+
+    def __init__(self, release):
+        match = _VERSION_RE.match(release)
+        if not match:
+            raise ValueError(f"Invalid OpenShift version: {release}")
+
+        major, minor, patch, prerelease, multi = match.groups()
+        self.release = release
+        self.major = int(major)
+        self.minor = int(minor)
+        self.patch = int(patch or 0)
+        self.prerelease = prerelease
+        self.multi = bool(multi)
+
+        # A prerelease sorts before its release, prerelease identifiers
+        # compare numerically when they are numbers (rc.10 > rc.9)
+        pre_key = ()
+        if prerelease:
+            pre_key = tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in prerelease.split("."))
+        self.key = (self.major, self.minor, self.patch, 0 if prerelease else 1, pre_key)
+
+    @property
+    def minor_version(self):
+        return f"{self.major}.{self.minor}"
+
+
+def ParseConstraint(constraint):
+    """Parse a constraint such as ">=4.15,<4.17" into a predicate on Version.
+
+    A bare version without operator matches that version and, when it has
+    no patch number, every release of that minor (4.16 matches 4.16.3).
+    """
+    checks = []
+    for part in constraint.split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        match = _CONSTRAINT_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid version constraint: {part}")
+        op, release = match.groups()
+        bound = Version(release)
+
+        if op is None and not _VERSION_RE.match(release).group(3):
+            checks.append(lambda v, b=bound: (v.major, v.minor) == (b.major, b.minor))
+        else:
+            checks.append(lambda v, b=bound, f=_OPERATORS[op or "=="]: f(v.key, b.key))
+
+    return lambda version: all(check(version) for check in checks)
+
+
+class VersionIndex:
+    """OpenShift versions sorted by semantic version.
+
+    Built from the /openshift-versions response, whose keys are the release
+    names and values the release details.
+    """
+
+    def __init__(self, versions):
+        self.versions = versions
+        self.entries = []
+        for release in versions:
+            try:
+                self.entries.append(Version(release))
+            except ValueError:
+                # Unknown release name formats can not be ordered
+                continue
+        self.entries.sort(key=lambda v: (v.key, v.multi))
+
+    def select(self, constraint=None, support_levels=None, default_only=False, include_prereleases=False,
+               latest_per_minor=False):
+        """Return the Version entries matching all the given filters, sorted."""
+        matches = self.entries
+
+        if not include_prereleases:
+            matches = [v for v in matches if not v.prerelease]
+        if constraint:
+            predicate = ParseConstraint(constraint)
+            matches = [v for v in matches if predicate(v)]
+        if support_levels:
+            matches = [v for v in matches if self.versions[v.release].get("support_level") in support_levels]
+        if default_only:
+            matches = [v for v in matches if self.versions[v.release].get("default")]
+
+        if latest_per_minor:
+            # Entries are sorted, the last one of each minor/flavor wins
+            latest = {}
+            for v in matches:
+                latest[(v.major, v.minor, v.multi)] = v
+            matches = sorted(latest.values(), key=lambda v: (v.key, v.multi))
+
+        return matches
+
+
+def Latest(versions):
+    """Return the release name of the highest of versions, single architecture releases first.
+
+    versions are Version entries sorted as VersionIndex.select returns them,
+    None is returned when there is none.
+    """
+    single = [v for v in versions if not v.multi]
+    candidates = single or versions
+    return candidates[-1].release if candidates else None
@@ -40,6 +40,120 @@ options:
         description: OpenShift version used to register a cluster (required for present). Note that this is required for cluster create operations.
         required: false
         type: str
+    clusters_spec:
+        description:
+          - Register several clusters concurrently with O(state=present), one cluster per element.
+          - Each element holds the registration fields of one cluster (V(name), V(openshift_version), ...),
+            the module level registration options such as O(openshift_version) act as defaults for all elements.
+          - The C(pull_secret) of an element defaults to the E(AI_PULL_SECRET) environment variable.
+          - A failed registration does not abort the others, the result of every element is returned.
+          - Mutually exclusive with O(name).
+        required: false
+        type: list
+        elements: dict
+    cluster_ids:
+        description:
+          - Delete all these clusters with O(state=absent). Clusters that do not exist anymore are left unchanged.
+          - Retrieve these clusters only, concurrently, when O(state) is not set. O(fields) and O(host_fields) apply,
+            the hosts are only returned with O(with_hosts), O(host_fields) or for the clusters of O(with_hosts_for).
+          - Mutually exclusive with O(cluster_id).
+        required: false
+        type: list
+        elements: str
+    name_pattern:
+        description:
+          - Select the clusters whose name matches this shell-style pattern (for instance V(ci-*)).
+          - Selected clusters are deleted with O(state=absent), and are the only ones listed when O(state) is not set.
+          - When combined with O(older_than_hours) or O(status), only the clusters matching all of them are selected.
+          - With O(state=absent), at least one of O(name_pattern) and O(older_than_hours) is required, O(status) alone
+            never selects clusters to delete.
+          - O(name_pattern), O(older_than_hours) and O(status) are mutually exclusive with O(cluster_id).
+        required: false
+        type: str
+    older_than_hours:
+        description: Select the clusters created more than this number of hours ago, see O(name_pattern).
+        required: false
+        type: int
+    status:
+        description:
+          - Only select the clusters with one of these statuses, see O(name_pattern).
+          - An empty list does not filter on the status.
+        required: false
+        type: list
+        elements: str
+    fields:
+        description:
+          - Only return these fields of each listed cluster, for instance V(id), V(name) and V(status).
+          - The C(hosts) of the clusters are returned along with the fields when they are requested with O(with_hosts),
+            O(host_fields) or O(with_hosts_for).
+        required: false
+        type: list
+        elements: str
+    host_fields:
+        description: Only return these fields of each host of the listed clusters.
+        required: false
+        type: list
+        elements: str
+    with_hosts_for:
+        description:
+          - Include the hosts of these clusters only in the returned list, instead of the hosts of all the
+            clusters with O(with_hosts).
+        required: false
+        type: list
+        elements: str
+    delta:
+        description:
+          - Only return the clusters added, updated or removed since the previous run, as RV(added), RV(updated) and
+            RV(removed), instead of listing all the clusters.
+          - The C(id) and C(updated_at) of the listed clusters are recorded in O(snapshot_file) after every run, and
+            the details of the added and updated clusters only are retrieved, concurrently.
+          - O(name_pattern), O(older_than_hours), O(status), O(fields) and O(host_fields) apply; one snapshot is kept
+            per set of filters. The hosts are only returned with O(with_hosts), O(host_fields) or O(with_hosts_for).
+        required: false
+        type: bool
+        default: false
+    snapshot_file:
+        description:
+          - File recording the clusters seen by the previous run with O(delta=true).
+          - Defaults to C(clusters_snapshot.json) in the C(~/.cache/assisted_installer) directory (or C(AI_CACHE_DIR)).
+        required: false
+        type: path
+    parallelism:
+        description: Maximum number of concurrent API calls for bulk operations such as O(clusters_spec) or O(cluster_ids).
+        required: false
+        type: int
+        default: 8
+    preflight:
+        description:
+          - Validate the registration payloads before registering clusters with O(state=present).
+          - The OpenShift version, CPU architecture, single node support and C(olm_operators) of every payload are
+            checked against the OpenShift versions, support levels and supported operators catalogs, and
+            the registration fails without any call to the clusters API when a payload is not supported.
+          - The catalogs are read from the local response cache when they are younger than O(preflight_cache_ttl).
+        required: false
+        type: bool
+        default: false
+    preflight_cache_ttl:
+        description: Number of seconds the catalogs used by O(preflight) are reused from the local response cache.
+        required: false
+        type: int
+        default: 86400
+    wait_for_status:
+        description:
+          - Wait until the cluster reaches one of these statuses, for instance V(ready) or V(installed).
+          - Applies to the cluster registered with O(state=present) and O(name), or to O(cluster_id) when O(state)
+            is not set.
+          - The cluster is polled with an exponential backoff within a single module run. The wait fails early when
+            the cluster goes to the V(error) or V(cancelled) status (unless waited for) or emits a C(critical) event.
+          - Mutually exclusive with O(clusters_spec).
+        required: false
+        type: list
+        elements: str
+    wait_timeout:
+        description: Maximum number of seconds to wait for O(wait_for_status).
+        required: false
+        type: int
+        default: 3600
 
 author:
     - Vishwanath Jayaraman (@vjayaramrh)
@@ -52,46 +166,160 @@ EXAMPLES = r"""
 - name: List clusters
   clusters:
 
+- name: List the name and status of the installed clusters
+  clusters:
+    status: [installed]
+    fields: [id, name, status, openshift_version]
+
+- name: List the clusters with the role and status of the hosts of one of them
+  clusters:
+    fields: [id, name, status]
+    host_fields: [requested_hostname, role, status]
+    with_hosts_for: ["deadbeef-dead-beef-dead-beefdeadbeef"]
+
+- name: Report the clusters that changed since the previous poll
+  clusters:
+    delta: true
+    fields: [id, name, status, status_info, updated_at]
+
+- name: Retrieve a few known clusters without listing the whole account
+  clusters:
+    cluster_ids:
+      - "deadbeef-dead-beef-dead-beefdeadbeef"
+      - "cafebabe-cafe-babe-cafe-babecafebabe"
+    fields: [id, name, status]
+
 - name: Delete cluster
   clusters:
     state: absent
     cluster_id: "deadbeef-dead-beef-dead-beefdeadbeef"
+
+- name: Register a cluster after validating it against the cached catalogs
+  clusters:
+    state: present
+    name: lab1
+    openshift_version: "4.16"
+    preflight: true
+
+- name: Delete the CI clusters older than a day
+  clusters:
+    state: absent
+    name_pattern: "ci-*"
+    older_than_hours: 24
+    parallelism: 16
+
+- name: Register several clusters
+  clusters:
+    state: present
+    openshift_version: "4.16"
+    clusters_spec:
+      - name: lab1
+      - name: lab2
+      - name: lab3
+        openshift_version: "4.17"
+
+- name: Wait for a cluster installation to complete
+  clusters:
+    cluster_id: "deadbeef-dead-beef-dead-beefdeadbeef"
+    wait_for_status: [installed]
+    wait_timeout: 7200
 """
 
 RETURN = r"""
 clusters:
-    description: A message with the status
+    description:
+      - A message with the status
+      - With O(clusters_spec), one element per registration with the C(name), the registered C(cluster) and
+        whether the registration C(failed), along with the API C(response) on failure.
+      - With O(cluster_ids), O(name_pattern) or O(older_than_hours), one element per cluster to delete with the
+        C(id), whether the cluster was C(deleted) and whether the deletion C(failed).
+      - With O(cluster_ids) and no O(state), one element per id in the same order with the C(id), the retrieved
+        C(cluster) and whether the retrieval C(failed), along with the API C(response) on failure.
+    type: list
+    returned: when O(delta=false)
+    sample: []
+added:
+    description: The clusters added since the previous run with O(delta=true), with their hosts when requested.
+    type: list
+    returned: when O(delta=true)
+    sample: []
+updated:
+    description: The clusters updated since the previous run with O(delta=true), with their hosts when requested.
     type: list
-    returned: always
+    returned: when O(delta=true)
+    sample: []
+removed:
+    description: The C(id) and C(name) of the clusters removed since the previous run with O(delta=true).
+    type: list
+    returned: when O(delta=true)
     sample: []
 """
 
 import os
-import traceback
+import time
+from datetime import datetime, timedelta, timezone
+from fnmatch import fnmatchcase
 
 try:
-    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apitoken
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient
 except ImportError:
-    from ansible.module_utils import apitoken
+    from ansible.module_utils import apiclient
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.basic import missing_required_lib
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import eventstream
+except ImportError:
+    from ansible.module_utils import eventstream
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import fanout
+except ImportError:
+    from ansible.module_utils import fanout
 
 try:
-    import requests
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import localstate
 except ImportError:
-    HAS_REQUESTS = False
-    REQUESTS_IMPORT_ERROR = traceback.format_exc()
-else:
-    HAS_REQUESTS = True
-    REQUESTS_IMPORT_ERROR = None
+    from ansible.module_utils import localstate
 
-API_VERSION = "v2"
-API_URL = f"https://api.openshift.com/api/assisted-install/{API_VERSION}"
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import preflight
+except ImportError:
+    from ansible.module_utils import preflight
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import missing_required_lib
 
 # add additional query parameters to the query_params_list
 QUERY_PARAMS_LIST = ["with_hosts"]
 
+# Module options that are not part of the registration payload
+MODULE_FIELDS = [
+    "state",
+    "with_hosts",
+    "cluster_id",
+    "cluster_ids",
+    "name_pattern",
+    "older_than_hours",
+    "status",
+    "fields",
+    "host_fields",
+    "with_hosts_for",
+    "delta",
+    "snapshot_file",
+    "clusters_spec",
+    "parallelism",
+    "preflight",
+    "preflight_cache_ttl",
+    "wait_for_status",
+    "wait_timeout",
+]
+
+# Statuses a cluster does not leave on its own
+FAILED_STATUSES = ["error", "cancelled"]
+
+# Polling backoff bounds in seconds for wait_for_status
+WAIT_INITIAL_DELAY = 5
+WAIT_MAX_DELAY = 60
+
 
 def run_module():
 
@@ -104,31 +332,55 @@ def run_module():
         with_hosts=dict(type="bool", required=False, default=False),
         name=dict(type="str", required=False),
         openshift_version=dict(type="str", required=False),
+        cluster_ids=dict(type="list", elements="str", required=False),
+        name_pattern=dict(type="str", required=False),
+        older_than_hours=dict(type="int", required=False),
+        status=dict(type="list", elements="str", required=False),
+        fields=dict(type="list", elements="str", required=False),
+        host_fields=dict(type="list", elements="str", required=False),
+        with_hosts_for=dict(type="list", elements="str", required=False),
+        delta=dict(type="bool", required=False, default=False),
+        snapshot_file=dict(type="path", required=False),
+        clusters_spec=dict(type="list", elements="dict", required=False),
+        parallelism=dict(type="int", required=False, default=fanout.DEFAULT_WORKERS),
+        preflight=dict(type="bool", required=False, default=False),
+        preflight_cache_ttl=dict(type="int", required=False, default=86400),
+        wait_for_status=dict(type="list", elements="str", required=False),
+        wait_timeout=dict(type="int", required=False, default=3600),
     )
-    token = apitoken.GetToken()
     module = AnsibleModule(
         argument_spec=module_args,
+        mutually_exclusive=[
+            ("name", "clusters_spec"),
+            ("cluster_id", "cluster_ids"),
+            # cluster_id designates one cluster, the selectors would be ignored
+            ("cluster_id", "name_pattern"),
+            ("cluster_id", "older_than_hours"),
+            ("cluster_id", "status"),
+            ("wait_for_status", "clusters_spec"),
+        ],
         required_if=[
-            ("state", "present", ["name", "openshift_version"]),
-            ("state", "absent", ["cluster_id"]),
+            ("state", "present", ["name", "clusters_spec"], True),
+            ("state", "absent", ["cluster_id", "cluster_ids", "name_pattern", "older_than_hours"], True),
         ],
         supports_check_mode=False,
     )
 
     # Fail if requests is not installed
-    if not HAS_REQUESTS:
+    if not apiclient.HAS_REQUESTS:
         module.fail_json(
-            msg=missing_required_lib("requests"), exception=REQUESTS_IMPORT_ERROR
+            msg=missing_required_lib("requests"), exception=apiclient.REQUESTS_IMPORT_ERROR
         )
 
-    # Set headers
-    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+    client = apiclient.GetClient(module)
+
+    # Delete clusters
+    if module.params.get("state") == "absent" and not module.params.get("cluster_id"):
+        result = delete_clusters(module, client)
 
     # Delete cluster
-    if module.params.get("state") == "absent":
-        response = requests.delete(
-            f"{API_URL}/clusters/{module.params.get('cluster_id')}", headers=headers
-        )
+    elif module.params.get("state") == "absent":
+        response = client.delete(f"/clusters/{module.params.get('cluster_id')}")
 
         if response.status_code != 204:
             result = dict(response=response.text)
@@ -139,14 +391,26 @@ def run_module():
 
         result = dict(changed=True, clusters=[])
 
+    # Register clusters
+    elif module.params.get("state") == "present" and module.params.get("clusters_spec"):
+        result = register_clusters(module, client)
+
     # Register cluster
     elif module.params.get("state") == "present":
+        if not module.params.get("openshift_version"):
+            module.fail_json(msg="state is present but all of the following are missing: openshift_version")
+
         pull_secret = os.environ.get("AI_PULL_SECRET")
 
         data = remove_module_fields(module)
         data["pull_secret"] = pull_secret
 
-        response = requests.post(f"{API_URL}/clusters", headers=headers, json=data)
+        if module.params.get("preflight"):
+            errors = check_payload(module, open_preflight(module, client), data)
+            if errors:
+                module.fail_json(msg=f"Preflight validation failed: {'; '.join(errors)}", errors=errors)
+
+        response = client.post("/clusters", json=data)
 
         if not response.ok:
             result = dict(changed=True, response=response.text)
@@ -154,32 +418,395 @@ def run_module():
 
         result = dict(clusters=response.json())
 
+        if module.params.get("wait_for_status"):
+            result["clusters"] = wait_for_status(module, client, result["clusters"]["id"])
+
+    # Wait for a cluster status
+    elif module.params.get("wait_for_status"):
+        if not module.params.get("cluster_id"):
+            module.fail_json(msg="wait_for_status requires cluster_id")
+
+        result = dict(clusters=wait_for_status(module, client, module.params.get("cluster_id")))
+
+    # Retrieve clusters
+    elif module.params.get("cluster_ids"):
+        result = get_clusters(module, client)
+
+    # List the clusters changed since the previous run
+    elif module.params.get("delta"):
+        result = sync_clusters(module, client)
+
     # List clusters
     else:
-        list_params = {}
-        for k in QUERY_PARAMS_LIST:
-            val = module.params.get(k)
-            if val:
-                list_params = list_params | {k: val}
-
-        response = requests.get(
-            f"{API_URL}/clusters", params=list_params, headers=headers
+        list_params = apiclient.BuildQuery(module.params, QUERY_PARAMS_LIST)
+        with_hosts_for = module.params.get("with_hosts_for") or []
+        selected = cluster_filter(module)
+
+        # Clusters are filtered and projected one at a time as the response
+        # is decoded, so that only the kept fields are ever held in memory
+        clusters = []
+        hosts_for = {}
+        try:
+            for cluster in client.iter_array("/clusters", params=list_params):
+                if not selected(cluster):
+                    continue
+                projected = project_cluster(module, cluster)
+                if cluster.get("id") in with_hosts_for:
+                    hosts_for[cluster["id"]] = projected
+                clusters.append(projected)
+        except apiclient.ApiError as e:
+            result = dict(changed=True, response=e.response.text)
+            module.fail_json(msg="Error listing clusters", **result)
+        except ValueError as e:
+            module.fail_json(msg=f"Error decoding the clusters list: {e}")
+
+        if hosts_for:
+            add_hosts(module, client, hosts_for)
+
+        result = dict(clusters=clusters)
+
+    module.exit_json(**result)
+
+
+def wait_for_status(module, client, cluster_id):
+    """Poll cluster_id until it reaches one of wait_for_status.
+
+    Critical events emitted during the wait are watched as well, so that a
+    failed installation is reported as soon as it is known.
+    """
+    wanted = module.params.get("wait_for_status")
+    deadline = time.monotonic() + module.params.get("wait_timeout")
+
+    # Only consider the events emitted from now on
+    started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    events_cursor = {"event_time": started}
+
+    for delay in apiclient.BackoffDelays(WAIT_INITIAL_DELAY, WAIT_MAX_DELAY):
+        response = client.get(f"/clusters/{cluster_id}")
+        if not response.ok:
+            result = dict(response=response.text)
+            module.fail_json(msg=f"Error retrieving cluster_id: {cluster_id}", **result)
+
+        cluster = response.json()
+        status = cluster.get("status")
+        if status in wanted:
+            return cluster
+        if status in FAILED_STATUSES:
+            module.fail_json(
+                msg=f"Cluster {cluster_id} reached status {status}: {cluster.get('status_info')}",
+                clusters=cluster,
+            )
+
+        events = eventstream.FollowStream(
+            client, {"cluster_id": cluster_id, "severities": "critical"}, events_cursor
         )
+        try:
+            critical_events = list(events)
+        except apiclient.ApiError as e:
+            result = dict(response=e.response.text)
+            module.fail_json(msg=f"Error listing events of cluster_id: {cluster_id}", **result)
+        events_cursor = events.cursor
+
+        if critical_events:
+            module.fail_json(
+                msg=f"Cluster {cluster_id} reported: {critical_events[-1].get('message')}",
+                clusters=cluster,
+                cluster_events=critical_events,
+            )
 
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            module.fail_json(
+                msg=f"Timeout waiting for cluster {cluster_id} to reach {', '.join(wanted)}, status is {status}",
+                clusters=cluster,
+            )
+        time.sleep(min(delay, remaining))
+
+
+def register_clusters(module, client):
+    """Register every element of clusters_spec concurrently."""
+    defaults = remove_module_fields(module)
+    pull_secret = os.environ.get("AI_PULL_SECRET")
+    checker = open_preflight(module, client) if module.params.get("preflight") else None
+    if checker is not None:
+        # Load the shared catalogs once before fanning out
+        load_preflight(module, checker)
+
+    def register(spec):
+        data = defaults | spec
+        data.setdefault("pull_secret", pull_secret)
+        if not data.get("name") or not data.get("openshift_version"):
+            return dict(name=data.get("name"), failed=True, msg="name and openshift_version are required")
+
+        if checker is not None:
+            errors = checker.check(data)
+            if errors:
+                return dict(name=data["name"], failed=True, msg=f"Preflight validation failed: {'; '.join(errors)}")
+
+        response = client.post("/clusters", json=data)
         if not response.ok:
-            result = dict(changed=True, response=response.text)
-            module.fail_json(msg="Error listing clusters", **result)
+            return dict(name=data["name"], failed=True, msg="Error registering cluster", response=response.text)
 
-        result = dict(clusters=response.json())
+        return dict(name=data["name"], failed=False, cluster=response.json())
 
-    module.exit_json(**result)
+    clusters = []
+    for outcome in fanout.Map(register, module.params.get("clusters_spec"), module.params.get("parallelism")):
+        if outcome.ok:
+            clusters.append(outcome.result)
+        else:
+            clusters.append(dict(name=outcome.item.get("name"), failed=True, msg=str(outcome.error)))
+
+    result = dict(changed=any(not c["failed"] for c in clusters), clusters=clusters)
+
+    failed = [c["name"] for c in clusters if c["failed"]]
+    if failed:
+        module.fail_json(msg=f"Error registering clusters: {', '.join(str(name) for name in failed)}", **result)
+
+    return result
+
+
+def open_preflight(module, client):
+    return preflight.Preflight(client, module.params.get("preflight_cache_ttl"))
+
+
+def load_preflight(module, checker):
+    try:
+        checker.load()
+    except apiclient.ApiError as e:
+        result = dict(response=e.response.text)
+        module.fail_json(msg="Error retrieving the catalogs for preflight validation", **result)
+
+
+def check_payload(module, checker, data):
+    try:
+        return checker.check(data)
+    except apiclient.ApiError as e:
+        result = dict(response=e.response.text)
+        module.fail_json(msg="Error retrieving the catalogs for preflight validation", **result)
+
+
+def cluster_filter(module):
+    """Return a predicate selecting clusters on name_pattern, older_than_hours and status."""
+    name_pattern = module.params.get("name_pattern")
+    older_than_hours = module.params.get("older_than_hours")
+    statuses = module.params.get("status")
+
+    if older_than_hours is not None:
+        created_before = datetime.now(timezone.utc) - timedelta(hours=older_than_hours)
+
+    def selected(cluster):
+        if name_pattern is not None and not fnmatchcase(cluster.get("name", ""), name_pattern):
+            return False
+        if older_than_hours is not None and apiclient.ParseTime(cluster["created_at"]) > created_before:
+            return False
+        if statuses and cluster.get("status") not in statuses:
+            return False
+        return True
+
+    return selected
+
+
+def wants_hosts(module, cluster_id):
+    """Tell whether the hosts of cluster_id are requested with with_hosts, with_hosts_for or host_fields."""
+    with_hosts_for = module.params.get("with_hosts_for")
+    if module.params.get("with_hosts"):
+        return True
+    if with_hosts_for:
+        return cluster_id in with_hosts_for
+    return bool(module.params.get("host_fields"))
+
+
+def project_cluster(module, cluster):
+    """Trim cluster and its hosts down to fields and host_fields.
+
+    The hosts are dropped unless they were requested: /clusters/{id} always
+    returns them, with their whole inventory.
+    """
+    fields = module.params.get("fields")
+
+    hosts = cluster.get("hosts") if wants_hosts(module, cluster.get("id")) else None
+    if fields:
+        cluster = {k: cluster[k] for k in fields if k in cluster}
+    else:
+        cluster = {k: v for k, v in cluster.items() if k != "hosts"}
+    if hosts is not None:
+        cluster["hosts"] = project_hosts(module, hosts)
+
+    return cluster
+
+
+def project_hosts(module, hosts):
+    host_fields = module.params.get("host_fields")
+    if not host_fields:
+        return hosts
+    return [{k: host[k] for k in host_fields if k in host} for host in hosts]
+
+
+def add_hosts(module, client, clusters):
+    """Retrieve the hosts of clusters, a dict of cluster id to listed cluster, concurrently."""
+
+    def get_hosts(cluster_id):
+        response = client.get(f"/clusters/{cluster_id}")
+        if not response.ok:
+            raise apiclient.ApiError(f"Error retrieving cluster_id: {cluster_id}", response)
+        return project_hosts(module, response.json().get("hosts") or [])
+
+    for outcome in fanout.Map(get_hosts, clusters, module.params.get("parallelism")):
+        if not outcome.ok:
+            module.fail_json(msg=f"Error retrieving hosts of cluster_id: {outcome.item}: {outcome.error}")
+        clusters[outcome.item]["hosts"] = outcome.result
+
+
+def snapshot_key(module):
+    # The snapshot only holds the clusters matching the filters, keep one
+    # snapshot per set of filters
+    return "|".join([
+        module.params.get("name_pattern") or "",
+        str(module.params.get("older_than_hours") or ""),
+        ",".join(sorted(module.params.get("status") or [])),
+    ])
+
+
+def sync_clusters(module, client):
+    """Return the clusters added, updated and removed since the snapshot, then update it."""
+    path = module.params.get("snapshot_file") or localstate.GetCacheDir("clusters_snapshot.json")
+    key = snapshot_key(module)
+    previous = localstate.ReadJSON(path, {}).get(key, {})
+
+    # Only the id, name and updated_at of every cluster are kept from the list
+    selected = cluster_filter(module)
+    current = {}
+    try:
+        for cluster in client.iter_array("/clusters"):
+            if selected(cluster):
+                current[cluster["id"]] = dict(name=cluster.get("name"), updated_at=cluster.get("updated_at"))
+    except apiclient.ApiError as e:
+        result = dict(response=e.response.text)
+        module.fail_json(msg="Error listing clusters", **result)
+    except ValueError as e:
+        module.fail_json(msg=f"Error decoding the clusters list: {e}")
+
+    added = [cluster_id for cluster_id in current if cluster_id not in previous]
+    updated = [
+        cluster_id for cluster_id in current
+        if cluster_id in previous and previous[cluster_id].get("updated_at") != current[cluster_id]["updated_at"]
+    ]
+    removed = [dict(id=cluster_id, name=seen.get("name")) for cluster_id, seen in previous.items()
+               if cluster_id not in current]
+
+    def get_cluster(cluster_id):
+        response = client.get(f"/clusters/{cluster_id}")
+        if response.status_code == 404:
+            # Deleted since it was listed
+            return None
+        if not response.ok:
+            raise apiclient.ApiError(f"Error retrieving cluster_id: {cluster_id}", response)
+        return project_cluster(module, response.json())
+
+    details = {}
+    for outcome in fanout.Map(get_cluster, added + updated, module.params.get("parallelism")):
+        if not outcome.ok:
+            # The snapshot is left untouched so that the next run reports the change again
+            module.fail_json(msg=f"Error retrieving cluster_id: {outcome.item}: {outcome.error}")
+        if outcome.result is None:
+            if outcome.item in previous:
+                removed.append(dict(id=outcome.item, name=current[outcome.item]["name"]))
+            del current[outcome.item]
+        else:
+            details[outcome.item] = outcome.result
+
+    # Other forks may be updating the snapshots of other filters
+    with localstate.FileLock(path + ".lock"):
+        snapshots = localstate.ReadJSON(path, {})
+        snapshots[key] = current
+        localstate.WriteJSON(path, snapshots)
+
+    return dict(
+        added=[details[cluster_id] for cluster_id in added if cluster_id in details],
+        updated=[details[cluster_id] for cluster_id in updated if cluster_id in details],
+        removed=removed,
+    )
+
+
+def select_clusters(module, client):
+    """Return the ids of the clusters matching name_pattern, older_than_hours and status.
+
+    status only narrows the selection down, an empty name_pattern or a
+    status alone select nothing rather than every cluster of the account.
+    """
+    if not module.params.get("name_pattern") and module.params.get("older_than_hours") is None:
+        return []
+
+    response = client.get("/clusters")
+    if not response.ok:
+        result = dict(response=response.text)
+        module.fail_json(msg="Error listing clusters", **result)
+
+    selected = cluster_filter(module)
+    return [cluster["id"] for cluster in response.json() if selected(cluster)]
+
+
+def get_clusters(module, client):
+    """Retrieve cluster_ids concurrently, in input order."""
+
+    def get(cluster_id):
+        response = client.get(f"/clusters/{cluster_id}")
+        if not response.ok:
+            return dict(id=cluster_id, failed=True, response=response.text)
+
+        return dict(id=cluster_id, cluster=project_cluster(module, response.json()), failed=False)
+
+    clusters = []
+    for outcome in fanout.Map(get, module.params.get("cluster_ids"), module.params.get("parallelism")):
+        if outcome.ok:
+            clusters.append(outcome.result)
+        else:
+            clusters.append(dict(id=outcome.item, failed=True, msg=str(outcome.error)))
+
+    result = dict(clusters=clusters)
+
+    failed = [c["id"] for c in clusters if c["failed"]]
+    if failed:
+        module.fail_json(msg=f"Error retrieving cluster_ids: {', '.join(failed)}", **result)
+
+    return result
+
+
+def delete_clusters(module, client):
+    """Delete cluster_ids and the selected clusters concurrently."""
+    cluster_ids = list(module.params.get("cluster_ids") or [])
+    cluster_ids += [i for i in select_clusters(module, client) if i not in cluster_ids]
+
+    def delete(cluster_id):
+        response = client.delete(f"/clusters/{cluster_id}")
+        # Already deleted clusters are left unchanged
+        if response.status_code == 404:
+            return dict(id=cluster_id, deleted=False, failed=False)
+        if response.status_code != 204:
+            return dict(id=cluster_id, deleted=False, failed=True, response=response.text)
+
+        return dict(id=cluster_id, deleted=True, failed=False)
+
+    clusters = []
+    for outcome in fanout.Map(delete, cluster_ids, module.params.get("parallelism")):
+        if outcome.ok:
+            clusters.append(outcome.result)
+        else:
+            clusters.append(dict(id=outcome.item, deleted=False, failed=True, msg=str(outcome.error)))
+
+    result = dict(changed=any(c["deleted"] for c in clusters), clusters=clusters)
+
+    failed = [c["id"] for c in clusters if c["failed"]]
+    if failed:
+        module.fail_json(msg=f"Error deleting cluster_ids: {', '.join(failed)}", **result)
+
+    return result
 
 
 def remove_module_fields(module):
     data = module.params.copy()
-    data.pop("state")
-    data.pop("with_hosts")
-    data.pop("cluster_id")
+    for field in MODULE_FIELDS:
+        data.pop(field)
 
     return data
 
@@ -20,8 +20,26 @@ options:
         description: The cluster ID to perform the action on.
         required: false
         type: str
+    cluster_ids:
+        description:
+          - Retrieve the events of several clusters in a single task.
+          - The events of each cluster are retrieved concurrently, as with O(all_pages=true), and returned as a
+            single list merged by C(event_time). O(limit) applies to each cluster.
+          - The first page of every cluster is retrieved concurrently, the next pages as the merge consumes them, so
+            that at most one page per cluster is held in memory.
+          - Mutually exclusive with O(cluster_id).
+        required: false
+        type: list
+        elements: str
+    parallelism:
+        description: Maximum number of clusters whose events are retrieved concurrently when O(cluster_ids) is set.
+        required: false
+        type: int
+        default: 8
     limit:
-        description: The maximum number of records/events to retrieve.
+        description:
+          - The maximum number of records/events to retrieve.
+          - With O(all_pages=true) this caps the total number of events retrieved across all pages.
         required: false
         type: int
     order:
@@ -41,6 +59,78 @@ options:
         type: list
         elements: str
         choices: [ info, warning, error, critical ]
+    all_pages:
+        description:
+          - Walk through all the event pages instead of issuing a single request.
+          - Events are requested O(page_size) at a time starting at O(offset), until O(limit) events have been
+            retrieved, O(timeout) expires, or there are no more events.
+        required: false
+        type: bool
+        default: false
+    page_size:
+        description: Number of events requested per page when O(all_pages=true).
+        required: false
+        type: int
+        default: 100
+    timeout:
+        description:
+          - Maximum number of seconds to spend retrieving pages when O(all_pages=true).
+          - The page being retrieved when the timeout expires is still returned in full.
+        required: false
+        type: int
+    follow:
+        description:
+          - Only return the events that were not returned by a previous run with O(follow=true).
+          - The position reached in the event history of O(cluster_id) is recorded in O(cursor_file) and the next
+            run resumes from there, so every run only retrieves new events.
+          - Implies O(all_pages=true) and ascending O(order), O(offset) is ignored.
+          - Requires O(cluster_id) or O(cluster_ids).
+        required: false
+        type: bool
+        default: false
+    cursor_file:
+        description:
+          - File recording the position reached in the event history of each cluster when O(follow=true).
+          - Defaults to C(events_cursors.json) in the C(~/.cache/assisted_installer) directory (or C(AI_CACHE_DIR)).
+        required: false
+        type: path
+    summary:
+        description:
+          - Aggregate the retrieved events into RV(summary) while they are retrieved.
+          - Use O(severities) to filter events server side and O(return_events=false) to only return the summary.
+        required: false
+        type: bool
+        default: false
+    summary_errors:
+        description: Number of latest C(error) and C(critical) events kept in the summary.
+        required: false
+        type: int
+        default: 10
+    return_events:
+        description:
+          - Return the retrieved events in RV(cluster_events). Set to V(false) to only return RV(summary).
+          - Ignored when O(dest) is set, the events are only written to O(dest) then.
+        required: false
+        type: bool
+        default: true
+    dest:
+        description:
+          - Write the retrieved events to this file, one JSON document per line (NDJSON), as they are retrieved.
+          - Only the number of events written and the path are returned, instead of the events themselves.
+        required: false
+        type: path
+    dest_compress:
+        description: Gzip compress O(dest).
+        required: false
+        type: bool
+        default: false
+    dest_append:
+        description:
+          - Append the events to O(dest) instead of overwriting it, for instance with O(follow=true).
+          - With O(dest_compress=true) every run appends a new gzip member, which gzip tools read as one stream.
+        required: false
+        type: bool
+        default: false
 
 author:
     - Akash Gopalakrishnan (@agopalak)
@@ -55,13 +145,49 @@ EXAMPLES = r"""
     order: descending
     offset: 10
     severities: ["critical", "info"]
+
+- name: Retrieve the whole event history of a cluster
+  events:
+    cluster_id: "deadmeat-dead-meat-dead-meatdeadmeat"
+    all_pages: true
+    page_size: 500
+    timeout: 120
+
+- name: Only retrieve the events emitted since the previous run
+  events:
+    cluster_id: "deadmeat-dead-meat-dead-meatdeadmeat"
+    follow: true
+
+- name: Merge the error events of several clusters
+  events:
+    cluster_ids:
+      - "deadmeat-dead-meat-dead-meatdeadmeat"
+      - "deadbeef-dead-beef-dead-beefdeadbeef"
+    severities: ["error", "critical"]
+    limit: 100
+
+- name: Summarize the whole event history of a cluster
+  events:
+    cluster_id: "deadmeat-dead-meat-dead-meatdeadmeat"
+    all_pages: true
+    summary: true
+    summary_errors: 5
+    return_events: false
+
+- name: Append the new events of a cluster to a compressed NDJSON file
+  events:
+    cluster_id: "deadmeat-dead-meat-dead-meatdeadmeat"
+    follow: true
+    dest: /var/log/assisted/deadmeat-events.ndjson.gz
+    dest_compress: true
+    dest_append: true
 """
 
 RETURN = r"""
 cluster_events:
     description: A list of cluster events
     type: dict
-    returned: always
+    returned: unless O(return_events=false) or O(dest) is set
     sample: [
             {
                 "cluster_id": "46f3094d-8967-4f1d-ad09-d5fdfda3830a",
@@ -86,24 +212,78 @@ cluster_events:
                 "severity": "info"
             }
         ]
+truncated:
+    description: Whether retrieval stopped because O(limit) or O(timeout) was reached.
+    type: bool
+    returned: when O(all_pages=true), O(follow=true) or O(cluster_ids) is set
+    sample: false
+summary:
+    description: Aggregated view of the retrieved events.
+    type: dict
+    returned: when O(summary=true)
+    sample: {
+            "by_name": {
+                "cluster_registration_succeeded": 1,
+                "cluster_status_updated": 1
+            },
+            "by_severity": {
+                "info": 2
+            },
+            "first_event_time": "2024-11-08T20:15:44.447Z",
+            "last_errors": [],
+            "last_event_time": "2024-11-08T20:15:52.436Z",
+            "last_status_update": {
+                "cluster_id": "46f3094d-8967-4f1d-ad09-d5fdfda3830a",
+                "event_time": "2024-11-08T20:15:52.436Z",
+                "message": "Updated status of the cluster to pending-for-input",
+                "name": "cluster_status_updated",
+                "severity": "info"
+            },
+            "total": 2
+        }
+dest:
+    description: Path of the file the events were written to.
+    type: str
+    returned: when O(dest) is set
+    sample: /var/log/assisted/deadmeat-events.ndjson.gz
+written:
+    description: Number of events written to O(dest).
+    type: int
+    returned: when O(dest) is set
+    sample: 3
+errors:
+    description: Error returned by the API for each cluster whose events could not be retrieved.
+    type: dict
+    returned: when O(cluster_ids) is set
+    sample: {}
 """
 
-import os
-import traceback
+import gzip
+import itertools
+import json
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import missing_required_lib
 
 try:
-    import requests
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient
+except ImportError:
+    from ansible.module_utils import apiclient
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import eventstream
 except ImportError:
-    HAS_REQUESTS = False
-    REQUESTS_IMPORT_ERROR = traceback.format_exc()
-else:
-    HAS_REQUESTS = True
-    REQUESTS_IMPORT_ERROR = None
+    from ansible.module_utils import eventstream
 
-API_VERSION = "v2"
-API_URL = f"https://api.openshift.com/api/assisted-install/{API_VERSION}"
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import fanout
+except ImportError:
+    from ansible.module_utils import fanout
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import localstate
+except ImportError:
+    from ansible.module_utils import localstate
 
 # add additional query parameters to the query_params_list
 QUERY_PARAMS_LIST = ["cluster_id", "limit", "order", "offset", "severities"]
@@ -117,42 +297,218 @@ def run_module():
         offset=dict(type="int", required=False, default=0),
         order=dict(type="str", required=False, default="ascending", choices=["ascending", "descending"]),
         severities=dict(type="list", elements="str", required=False, choices=["info", "warning", "error", "critical"]),
+        all_pages=dict(type="bool", required=False, default=False),
+        page_size=dict(type="int", required=False, default=100),
+        timeout=dict(type="int", required=False),
+        follow=dict(type="bool", required=False, default=False),
+        cursor_file=dict(type="path", required=False),
+        cluster_ids=dict(type="list", elements="str", required=False),
+        parallelism=dict(type="int", required=False, default=fanout.DEFAULT_WORKERS),
+        summary=dict(type="bool", required=False, default=False),
+        summary_errors=dict(type="int", required=False, default=10),
+        return_events=dict(type="bool", required=False, default=True),
+        dest=dict(type="path", required=False),
+        dest_compress=dict(type="bool", required=False, default=False),
+        dest_append=dict(type="bool", required=False, default=False),
     )
 
-    token = os.environ.get('AI_API_TOKEN')
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=False)
+    module = AnsibleModule(
+        argument_spec=module_args,
+        mutually_exclusive=[
+            ("cluster_id", "cluster_ids"),
+        ],
+        required_if=[
+            ("follow", True, ["cluster_id", "cluster_ids"], True),
+        ],
+        supports_check_mode=False,
+    )
 
     # Fail if requests is not installed
-    if not HAS_REQUESTS:
-        module.fail_json(msg=missing_required_lib('requests'), exception=REQUESTS_IMPORT_ERROR)
+    if not apiclient.HAS_REQUESTS:
+        module.fail_json(msg=missing_required_lib('requests'), exception=apiclient.REQUESTS_IMPORT_ERROR)
 
-    # Set headers
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {token}'
-    }
+    client = apiclient.GetClient(module)
+
+    if module.params.get("page_size") < 1:
+        module.fail_json(msg="page_size must be a positive integer")
+
+    if module.params.get("follow") and module.params.get("order") != "ascending":
+        module.fail_json(msg="follow requires ascending order")
+
+    if module.params.get("cluster_ids"):
+        list_fleet_events(module, client)
+
+    if module.params.get("all_pages") or module.params.get("follow"):
+        list_all_events(module, client)
 
     # List cluster events
-    list_params = {}
-    for k in QUERY_PARAMS_LIST:
-        val = module.params.get(k)
-        if val:
-            if isinstance(val, list):
-                list_params = list_params | {k: ",".join(val)}
-            else:
-                list_params = list_params | {k: val}
+    list_params = apiclient.BuildQuery(module.params, QUERY_PARAMS_LIST)
 
-    response = requests.get(f"{API_URL}/events", params=list_params, headers=headers)
+    response = client.get("/events", params=list_params)
 
     if not response.ok:
         result = dict(changed=True, response=response.text)
         module.fail_json(msg="Error listing cluster events", **result)
 
-    result = dict(changed=False, cluster_events=response.json())
+    result = collect_events(module, response.json())
 
     module.exit_json(**result)
 
 
+def open_dest(module):
+    dest = module.params.get("dest")
+    mode = "a" if module.params.get("dest_append") else "w"
+    try:
+        if module.params.get("dest_compress"):
+            return gzip.open(dest, mode + "t", encoding="utf-8")
+        return open(dest, mode, encoding="utf-8")
+    except OSError as e:
+        module.fail_json(msg=f"Error opening {dest}: {e}")
+
+
+def collect_events(module, events):
+    """Consume events into the cluster_events list, the summary and/or dest.
+
+    Returns the module result, events are consumed one at a time so that
+    only what is returned is kept in memory.
+    """
+    summary = eventstream.EventSummary(module.params.get("summary_errors")) if module.params.get("summary") else None
+    dest = open_dest(module) if module.params.get("dest") else None
+    cluster_events = [] if module.params.get("return_events") and dest is None else None
+    written = 0
+
+    try:
+        for event in events:
+            if summary is not None:
+                summary.add(event)
+            if cluster_events is not None:
+                cluster_events.append(event)
+            if dest is not None:
+                try:
+                    dest.write(json.dumps(event) + "\n")
+                except OSError as e:
+                    module.fail_json(msg=f"Error writing cluster events to {module.params.get('dest')}: {e}")
+                written += 1
+    finally:
+        if dest is not None:
+            dest.close()
+
+    result = dict(changed=written > 0)
+    if cluster_events is not None:
+        result["cluster_events"] = cluster_events
+    if summary is not None:
+        result["summary"] = summary.result()
+    if dest is not None:
+        result["dest"] = module.params.get("dest")
+        result["written"] = written
+    return result
+
+
+def open_cursors(module):
+    if not module.params.get("follow"):
+        return None
+
+    return eventstream.EventCursors(
+        module.params.get("cursor_file") or localstate.GetCacheDir("events_cursors.json")
+    )
+
+
+def cursor_key(module, cluster_id):
+    # Offsets only make sense for a given set of filters, keep one cursor
+    # per cluster and severity filter
+    return "|".join([cluster_id] + sorted(module.params.get("severities") or []))
+
+
+def save_cursor(module, cursors, cluster_id, stream):
+    try:
+        cursors.update(cursor_key(module, cluster_id), stream.cursor)
+    except OSError as e:
+        module.fail_json(msg=f"Error saving events cursor: {e}")
+
+
+def open_stream(module, client, cluster_id, cursors):
+    # limit and offset drive the pagination instead of being sent as is
+    list_params = apiclient.BuildQuery(module.params, [k for k in QUERY_PARAMS_LIST if k not in ("limit", "offset")])
+    if cluster_id:
+        list_params = list_params | {"cluster_id": cluster_id}
+
+    stream_args = dict(
+        page_size=module.params.get("page_size"),
+        limit=module.params.get("limit"),
+        timeout=module.params.get("timeout"),
+    )
+
+    if cursors is not None:
+        return eventstream.FollowStream(client, list_params, cursors.get(cursor_key(module, cluster_id)), **stream_args)
+
+    return eventstream.EventStream(client, list_params, offset=module.params.get("offset"), **stream_args)
+
+
+def list_all_events(module, client):
+    cluster_id = module.params.get("cluster_id")
+    cursors = open_cursors(module)
+    stream = open_stream(module, client, cluster_id, cursors)
+
+    try:
+        result = collect_events(module, stream)
+    except apiclient.ApiError as e:
+        result = dict(changed=True, response=e.response.text)
+        module.fail_json(msg="Error listing cluster events", **result)
+
+    if cursors is not None:
+        save_cursor(module, cursors, cluster_id, stream)
+
+    module.exit_json(truncated=stream.truncated, **result)
+
+
+def list_fleet_events(module, client):
+    cursors = open_cursors(module)
+
+    def fetch(cluster_id):
+        # Prefetch the first page concurrently, the rest of the stream is
+        # consumed lazily by the merge so only one page per cluster is held
+        stream = open_stream(module, client, cluster_id, cursors)
+        events = iter(stream)
+        first_page = list(itertools.islice(events, module.params.get("page_size")))
+        return stream, itertools.chain(first_page, events)
+
+    outcomes = fanout.Map(fetch, module.params.get("cluster_ids"), module.params.get("parallelism"))
+
+    errors = {}
+    for outcome in outcomes:
+        if outcome.ok:
+            continue
+        if isinstance(outcome.error, apiclient.ApiError):
+            errors[outcome.item] = outcome.error.response.text
+        else:
+            errors[outcome.item] = str(outcome.error)
+
+    if len(errors) == len(outcomes):
+        module.fail_json(msg="Error listing cluster events", errors=errors)
+
+    streams = [outcome.result for outcome in outcomes if outcome.ok]
+    try:
+        result = collect_events(module, eventstream.MergeEvents(
+            [events for stream, events in streams],
+            descending=module.params.get("order") == "descending",
+        ))
+    except apiclient.ApiError as e:
+        result = dict(changed=True, response=e.response.text)
+        module.fail_json(msg="Error listing cluster events", errors=errors, **result)
+
+    # Only move the cursors once the events were handled
+    if cursors is not None:
+        for outcome in outcomes:
+            if outcome.ok:
+                save_cursor(module, cursors, outcome.item, outcome.result[0])
+
+    module.exit_json(
+        truncated=any(stream.truncated for stream, events in streams),
+        errors=errors,
+        **result,
+    )
+
+
 def main():
     run_module()
 
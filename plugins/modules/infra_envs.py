@@ -23,6 +23,76 @@ options:
         choices: ["absent", "present"]
         default: null
         type: str
+    infra_env_id:
+        description: The infra-env ID to perform the action on (required for operations on a specific infra-env)
+        required: false
+        type: str
+    infra_env_ids:
+        description:
+          - Delete all these infra-envs with O(state=absent). Infra-envs that do not exist anymore are left unchanged.
+          - Retrieve these infra-envs only, concurrently, when O(state) is not set.
+          - Mutually exclusive with O(infra_env_id).
+        required: false
+        type: list
+        elements: str
+    infra_envs_spec:
+        description:
+          - Create one infra-env per element with O(state=present), concurrently.
+          - Each element holds the fields of one infra-env, for instance its C(name) and C(cluster_id); the other
+            module options such as O(pull_secret) or O(openshift_version) are used as defaults.
+          - Mutually exclusive with O(name).
+        required: false
+        type: list
+        elements: dict
+    parallelism:
+        description: Maximum number of concurrent API calls for bulk operations such as O(infra_envs_spec) or O(infra_env_ids).
+        required: false
+        type: int
+        default: 8
+    download_dest:
+        description:
+          - Download the discovery ISO of the created or retrieved infra-env to this file.
+          - Mutually exclusive with O(infra_envs_spec) and O(infra_env_ids).
+          - The ISO is streamed to disk and an interrupted download is resumed where it stopped, by this run or the
+            next one. Nothing is downloaded when the file already matches O(download_checksum) or, without
+            checksum, the size of the ISO.
+        required: false
+        type: path
+    download_checksum:
+        description: Expected checksum of the ISO, as C(<algorithm>:<digest>) or a sha256 digest.
+        required: false
+        type: str
+    download_retries:
+        description: Number of times an interrupted ISO download is resumed before failing.
+        required: false
+        type: int
+        default: 5
+    download_segments:
+        description:
+          - Number of concurrent ranged requests an ISO of at least 64 MiB is downloaded over, when the server
+            supports ranges.
+          - V(1) downloads over a single connection.
+        required: false
+        type: int
+        default: 4
+    iso_cache:
+        description:
+          - Keep the downloaded ISOs in a cache on the controller, in the C(isos) directory of
+            C(~/.cache/assisted_installer) (or C(AI_CACHE_DIR)), and copy the cached ISO to O(download_dest)
+            instead of downloading it again.
+          - ISOs are cached by C(openshift_version), C(cpu_architecture) and image C(type) of the infra-env, and
+            stored once per content.
+          - As discovery ISOs embed the ignition, SSH key and proxy of their infra-env, a cached ISO is only reused
+            when it matches O(download_checksum) or, without checksum, when a C(HEAD) request of the C(download_url)
+            reports the same size and strong C(ETag) as when it was cached.
+        required: false
+        type: bool
+        default: false
+    iso_cache_max_size:
+        description: Maximum size of the ISO cache in MiB, the least recently used ISOs are evicted beyond.
+        required: false
+        type: int
+        default: 10240
     name:
         description: Name used to create a infra-envs resource. Note that this is required for infra-envs resource create operations.
         required: false
@@ -31,6 +101,43 @@ options:
         description: A secret object that stores credentials to pull container images from private registries. Note that is is required for create operations.
         required: false
         type: str
+    cluster_id:
+        description:
+          - The cluster the hosts booted from the infra-env are bound to.
+          - When O(state) is not set, only list the infra-envs of this cluster.
+        required: false
+        type: str
+    openshift_version:
+        description: Version of the OpenShift cluster the discovery image is built for
+        required: false
+        type: str
+    cpu_architecture:
+        description: The CPU architecture of the discovery image
+        required: false
+        choices: [x86_64, aarch64, arm64, ppc64le, s390x]
+        type: str
+    image_type:
+        description: Type of the discovery image
+        required: false
+        choices: [full-iso, minimal-iso]
+        type: str
+    ssh_authorized_key:
+        description: SSH public key for debugging the hosts booted from the discovery image
+        required: false
+        type: str
+    additional_ntp_sources:
+        description: A comma-separated list of NTP sources (name or IP) going to be added to all the hosts
+        required: false
+        type: str
+    proxy:
+        description: Proxy settings of the hosts, with C(http_proxy), C(https_proxy) and C(no_proxy)
+        required: false
+        type: dict
+    static_network_config:
+        description: Static network configuration of the hosts, one element per host
+        required: false
+        type: list
+        elements: dict
 
 author:
     - Vishwanath Jayaraman (@vjayaramrh)
@@ -56,12 +163,54 @@ EXAMPLES = r"""
   infra_envs:
     state: absent
     infra_env_id: "deadbeef-dead-beef-dead-beefdeadbeef"
+
+- name: Download the discovery ISO of an infra-env
+  infra_envs:
+    infra_env_id: "deadbeef-dead-beef-dead-beefdeadbeef"
+    download_dest: /var/lib/isos/lab1.iso
+
+- name: Download the ISO once for all the infra-envs booting the same image
+  infra_envs:
+    infra_env_id: "{{ item }}"
+    download_dest: "/var/lib/isos/{{ item }}.iso"
+    download_checksum: "sha256:{{ iso_sha256 }}"
+    iso_cache: true
+  loop: "{{ infra_env_ids }}"
+
+- name: List the infra-envs of a cluster
+  infra_envs:
+    cluster_id: "deadbeef-dead-beef-dead-beefdeadbeef"
+
+- name: Create one infra-env per cluster
+  infra_envs:
+    state: present
+    pull_secret: blah
+    openshift_version: "4.16"
+    image_type: minimal-iso
+    infra_envs_spec:
+      - name: lab1-infra
+        cluster_id: "deadbeef-dead-beef-dead-beefdeadbeef"
+      - name: lab2-infra
+        cluster_id: "cafebabe-cafe-babe-cafe-babecafebabe"
+    parallelism: 16
+
+- name: Delete several infra-envs
+  infra_envs:
+    state: absent
+    infra_env_ids:
+      - "deadbeef-dead-beef-dead-beefdeadbeef"
+      - "cafebabe-cafe-babe-cafe-babecafebabe"
 """
 
 RETURN = r"""
-result:
-    description: Result from the API POST call
-    type: dict
+infra_envs:
+    description:
+      - The created or retrieved infra-env, or the list of infra-envs when O(state) is not set.
+      - With O(infra_envs_spec), one element per creation with the C(name), the created C(infra_env) and
+        whether the creation C(failed), along with the API C(response) on failure.
+      - With O(infra_env_ids), one element per id in the same order with the C(id), the retrieved C(infra_env) or
+        whether it was C(deleted) with O(state=absent), and whether the operation C(failed).
+    type: raw
     returned: always
     sample: {
         "infra-envs": {
@@ -83,31 +232,68 @@ result:
             "user_name": "vjayaram@redhat.com"
         }
     }
+download:
+    description:
+      - Outcome of the ISO download with O(download_dest), with the C(dest) file and its C(size).
+      - When the ISO was downloaded, its C(checksum), the offset the download C(resumed_from), the number of bytes
+        C(transferred), the number of concurrent C(segments), the C(elapsed) seconds and the C(throughput) in bytes
+        per second.
+      - With O(iso_cache), whether the ISO was C(cached) already.
+    type: dict
+    returned: when O(download_dest) is set
+    sample: {
+        "changed": true,
+        "checksum": "sha256:0d4b2d1d4f1c3b1f7e1a0c5b3e0f2f5e1d6c7b8a9f0e1d2c3b4a5f6e7d8c9b0a",
+        "dest": "/var/lib/isos/lab1.iso",
+        "elapsed": 42.7,
+        "resumed_from": 0,
+        "segments": 4,
+        "size": 108003328,
+        "throughput": 2529351,
+        "transferred": 108003328
+    }
 """
 
-import traceback
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import missing_required_lib
 
 try:
-    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apitoken
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient
+except ImportError:
+    from ansible.module_utils import apiclient
+
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import download
 except ImportError:
-    from ansible.module_utils import apitoken
+    from ansible.module_utils import download
 
 try:
-    import requests
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import fanout
 except ImportError:
-    HAS_REQUESTS = False
-    REQUESTS_IMPORT_ERROR = traceback.format_exc()
-else:
-    HAS_REQUESTS = True
-    REQUESTS_IMPORT_ERROR = None
+    from ansible.module_utils import fanout
 
-API_VERSION = "v2"
-API_URL = f"https://api.openshift.com/api/assisted-install/{API_VERSION}"
+try:
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import isocache
+except ImportError:
+    from ansible.module_utils import isocache
 
 # add additional query parameters to the query_params_list
-QUERY_PARAMS_LIST = []
+QUERY_PARAMS_LIST = ["cluster_id"]
+
+# Module options that are not part of the creation payload
+MODULE_FIELDS = [
+    "state",
+    "infra_env_id",
+    "infra_env_ids",
+    "infra_envs_spec",
+    "parallelism",
+    "download_dest",
+    "download_checksum",
+    "download_retries",
+    "download_segments",
+    "iso_cache",
+    "iso_cache_max_size",
+]
 
 
 def run_module():
@@ -116,49 +302,245 @@ def run_module():
         state=dict(
             type="str", required=False, choices=["absent", "present"], default=None
         ),
+        infra_env_id=dict(type="str", required=False),
+        infra_env_ids=dict(type="list", elements="str", required=False),
+        infra_envs_spec=dict(type="list", elements="dict", required=False),
+        parallelism=dict(type="int", required=False, default=fanout.DEFAULT_WORKERS),
+        download_dest=dict(type="path", required=False),
+        download_checksum=dict(type="str", required=False),
+        download_retries=dict(type="int", required=False, default=download.RETRIES),
+        download_segments=dict(type="int", required=False, default=download.SEGMENTS),
+        iso_cache=dict(type="bool", required=False, default=False),
+        iso_cache_max_size=dict(type="int", required=False, default=10240),
         # any API query parameters may have to be added here
         name=dict(type="str", required=False),
         pull_secret=dict(type="str", required=False, no_log=True),
+        cluster_id=dict(type="str", required=False),
+        openshift_version=dict(type="str", required=False),
+        cpu_architecture=dict(type="str", required=False, choices=["x86_64", "aarch64", "arm64", "ppc64le", "s390x"]),
+        image_type=dict(type="str", required=False, choices=["full-iso", "minimal-iso"]),
+        ssh_authorized_key=dict(type="str", required=False),
+        additional_ntp_sources=dict(type="str", required=False),
+        proxy=dict(type="dict", required=False),
+        static_network_config=dict(type="list", elements="dict", required=False),
     )
-    token = apitoken.GetToken()
     module = AnsibleModule(
         argument_spec=module_args,
+        mutually_exclusive=[
+            ("name", "infra_envs_spec"),
+            ("infra_env_id", "infra_env_ids"),
+            # The ISO of a single infra-env only is downloaded
+            ("download_dest", "infra_envs_spec"),
+            ("download_dest", "infra_env_ids"),
+        ],
         required_if=[
-            ("state", "present", ["name", "pull_secret"])
+            ("state", "present", ["pull_secret"]),
+            ("state", "present", ["name", "infra_envs_spec"], True),
+            ("state", "absent", ["infra_env_id", "infra_env_ids"], True),
         ],
         supports_check_mode=False,
     )
 
     # Fail if requests is not installed
-    if not HAS_REQUESTS:
+    if not apiclient.HAS_REQUESTS:
         module.fail_json(
-            msg=missing_required_lib("requests"), exception=REQUESTS_IMPORT_ERROR
+            msg=missing_required_lib("requests"), exception=apiclient.REQUESTS_IMPORT_ERROR
         )
 
-    # Set headers
-    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+    client = apiclient.GetClient(module)
 
     # Create infra-envs
-    if module.params.get("state") == "present":
+    if module.params.get("state") == "present" and module.params.get("infra_envs_spec"):
+        result = create_infra_envs(module, client)
+
+    # Create infra-env
+    elif module.params.get("state") == "present":
 
         data = remove_module_fields(module)
 
-        response = requests.post(f"{API_URL}/infra-envs", headers=headers, json=data)
+        response = client.post("/infra-envs", json=data)
 
         if not response.ok:
             result = dict(changed=True, response=response.text)
             module.fail_json(msg="Error creating infra-envs", **result)
 
-        result = {"infra_envs": response.json()}
+        result = dict(changed=True, infra_envs=response.json())
+
+        if module.params.get("download_dest"):
+            result["download"] = download_iso(module, client, result["infra_envs"])
+
+    # Delete infra-envs
+    elif module.params.get("state") == "absent" and module.params.get("infra_env_ids"):
+        result = delete_infra_envs(module, client)
+
+    # Delete infra-env
+    elif module.params.get("state") == "absent":
+        response = client.delete(f"/infra-envs/{module.params.get('infra_env_id')}")
+
+        if response.status_code != 204:
+            result = dict(response=response.text)
+            module.fail_json(
+                msg=f"Error deleting infra_env_id: {module.params.get('infra_env_id')}",
+                **result,
+            )
+
+        result = dict(changed=True, infra_envs=[])
+
+    # Retrieve infra-envs
+    elif module.params.get("infra_env_ids"):
+        result = get_infra_envs(module, client)
+
+    # Retrieve infra-env
+    elif module.params.get("infra_env_id"):
+        response = client.get(f"/infra-envs/{module.params.get('infra_env_id')}")
+
+        if not response.ok:
+            result = dict(response=response.text)
+            module.fail_json(msg=f"Error retrieving infra_env_id: {module.params.get('infra_env_id')}", **result)
+
+        result = dict(infra_envs=response.json())
+
+        if module.params.get("download_dest"):
+            result["download"] = download_iso(module, client, result["infra_envs"])
+            result["changed"] = result["download"]["changed"]
+
+    # List infra-envs
+    else:
+        list_params = apiclient.BuildQuery(module.params, QUERY_PARAMS_LIST)
+
+        response = client.get("/infra-envs", params=list_params)
+
+        if not response.ok:
+            result = dict(response=response.text)
+            module.fail_json(msg="Error listing infra-envs", **result)
+
+        result = dict(infra_envs=response.json())
 
     module.exit_json(**result)
 
 
+def download_iso(module, client, infra_env):
+    """Download the discovery ISO of infra_env to download_dest."""
+    kwargs = dict(
+        checksum=module.params.get("download_checksum"),
+        retries=module.params.get("download_retries"),
+        segments=module.params.get("download_segments"),
+    )
+    try:
+        if module.params.get("iso_cache"):
+            cache = isocache.IsoCache(max_bytes=module.params.get("iso_cache_max_size") * 1024 * 1024)
+            return isocache.CachedDownload(
+                client,
+                infra_env["download_url"],
+                module.params.get("download_dest"),
+                isocache.ImageKey(infra_env),
+                cache,
+                **kwargs,
+            )
+
+        return download.Download(client, infra_env["download_url"], module.params.get("download_dest"), **kwargs)
+    except apiclient.ApiError as e:
+        result = dict(response=e.response.text)
+        module.fail_json(msg=f"Error downloading the ISO of infra_env_id: {infra_env['id']}", **result)
+    except download.DownloadError as e:
+        module.fail_json(msg=str(e))
+    except OSError as e:
+        module.fail_json(msg=f"Error writing {module.params.get('download_dest')}: {e}")
+
+
+def create_infra_envs(module, client):
+    """Create every element of infra_envs_spec concurrently."""
+    defaults = remove_module_fields(module)
+
+    def create(spec):
+        data = defaults | spec
+        if not data.get("name"):
+            return dict(name=None, failed=True, msg="name is required")
+
+        response = client.post("/infra-envs", json=data)
+        if not response.ok:
+            return dict(name=data["name"], failed=True, msg="Error creating infra-env", response=response.text)
+
+        return dict(name=data["name"], failed=False, infra_env=response.json())
+
+    infra_envs = []
+    for outcome in fanout.Map(create, module.params.get("infra_envs_spec"), module.params.get("parallelism")):
+        if outcome.ok:
+            infra_envs.append(outcome.result)
+        else:
+            infra_envs.append(dict(name=outcome.item.get("name"), failed=True, msg=str(outcome.error)))
+
+    result = dict(changed=any(not i["failed"] for i in infra_envs), infra_envs=infra_envs)
+
+    failed = [i["name"] for i in infra_envs if i["failed"]]
+    if failed:
+        module.fail_json(msg=f"Error creating infra-envs: {', '.join(str(name) for name in failed)}", **result)
+
+    return result
+
+
+def get_infra_envs(module, client):
+    """Retrieve infra_env_ids concurrently, in input order."""
+
+    def get(infra_env_id):
+        response = client.get(f"/infra-envs/{infra_env_id}")
+        if not response.ok:
+            return dict(id=infra_env_id, failed=True, response=response.text)
+
+        return dict(id=infra_env_id, infra_env=response.json(), failed=False)
+
+    infra_envs = []
+    for outcome in fanout.Map(get, module.params.get("infra_env_ids"), module.params.get("parallelism")):
+        if outcome.ok:
+            infra_envs.append(outcome.result)
+        else:
+            infra_envs.append(dict(id=outcome.item, failed=True, msg=str(outcome.error)))
+
+    result = dict(infra_envs=infra_envs)
+
+    failed = [i["id"] for i in infra_envs if i["failed"]]
+    if failed:
+        module.fail_json(msg=f"Error retrieving infra_env_ids: {', '.join(failed)}", **result)
+
+    return result
+
+
+def delete_infra_envs(module, client):
+    """Delete infra_env_ids concurrently."""
+
+    def delete(infra_env_id):
+        response = client.delete(f"/infra-envs/{infra_env_id}")
+        # Already deleted infra-envs are left unchanged
+        if response.status_code == 404:
+            return dict(id=infra_env_id, deleted=False, failed=False)
+        if response.status_code != 204:
+            return dict(id=infra_env_id, deleted=False, failed=True, response=response.text)
+
+        return dict(id=infra_env_id, deleted=True, failed=False)
+
+    infra_envs = []
+    for outcome in fanout.Map(delete, module.params.get("infra_env_ids"), module.params.get("parallelism")):
+        if outcome.ok:
+            infra_envs.append(outcome.result)
+        else:
+            infra_envs.append(dict(id=outcome.item, deleted=False, failed=True, msg=str(outcome.error)))
+
+    result = dict(changed=any(i["deleted"] for i in infra_envs), infra_envs=infra_envs)
+
+    failed = [i["id"] for i in infra_envs if i["failed"]]
+    if failed:
+        module.fail_json(msg=f"Error deleting infra_env_ids: {', '.join(failed)}", **result)
+
+    return result
+
+
 def remove_module_fields(module):
     data = module.params.copy()
-    data.pop("state")
+    for field in MODULE_FIELDS:
+        data.pop(field)
 
-    return data
+    # Unset options are not sent, they would override the API defaults
+    return {k: v for k, v in data.items() if v is not None}
 
 
 def main():
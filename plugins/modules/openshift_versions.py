@@ -28,6 +28,50 @@ options:
     default: False
     type: bool
 
+  cache_ttl:
+    description:
+      - Reuse the response of an identical query made less than this number of seconds ago from the local
+        response cache in C(~/.cache/assisted_installer) (or C(AI_CACHE_DIR)), without any request to the API.
+      - Expired responses are revalidated with a conditional request. V(0) disables the cache.
+    required: False
+    default: 0
+    type: int
+
+  constraint:
+    description:
+      - Only return the versions matching this semantic version constraint, for instance V(>=4.15,<4.17).
+      - Comma separated comparisons with V(>=), V(<=), V(>), V(<), V(==) or V(!=). A bare V(4.16) matches every
+        4.16 release.
+    required: False
+    type: str
+
+  include_prereleases:
+    description:
+      - Let pre-release versions (V(4.17.0-rc.1)) match O(constraint), O(support_level), O(default_only) and
+        O(latest_per_minor), they are left out by these filters otherwise.
+      - Without any of these filters, every version the API lists is returned, pre-releases included.
+    required: False
+    default: False
+    type: bool
+
+  latest_per_minor:
+    description: Only return the latest patch version of each minor version, for each of the single and multi architecture releases.
+    required: False
+    default: False
+    type: bool
+
+  support_level:
+    description: Only return the versions with one of these support levels, for instance V(production).
+    required: False
+    type: list
+    elements: str
+
+  default_only:
+    description: Only return the default version.
+    required: False
+    default: False
+    type: bool
+
 author:
     - Michele Costa  (@nocturnalstro)
 """
@@ -37,6 +81,16 @@ EXAMPLES = r"""
   openshift_versions:
     version: 4.18
     only_latest: true
+
+- name: Query the latest production patch of OpenShift 4.15 and 4.16
+  openshift_versions:
+    constraint: ">=4.15,<4.17"
+    latest_per_minor: true
+    support_level: [production]
+
+- name: Query OpenShift versions, reusing the response for an hour
+  openshift_versions:
+    cache_ttl: 3600
 """
 
 RETURN = r"""
@@ -67,69 +121,81 @@ versions:
         "support_level": "production"
     }
   }
+sorted_versions:
+  description: The names of the returned versions, sorted by ascending semantic version
+  type: list
+  elements: str
+  returned: always
+  sample: ["4.18.1", "4.18.1-multi"]
+latest:
+  description: The highest returned version, single architecture releases first
+  type: str
+  returned: when at least one version is returned
+  sample: "4.18.1"
 """
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import missing_required_lib
 
-import traceback
-
-try:
-    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apitoken, apiurl
-except ImportError:
-    from ansible.module_utils import apitoken, apiurl
-
 try:
-    import requests
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient, catalog, versionindex
 except ImportError:
-    HAS_REQUESTS = False
-    REQUESTS_IMPORT_ERROR = traceback.format_exc()
-else:
-    HAS_REQUESTS = True
-    REQUESTS_IMPORT_ERROR = None
+    from ansible.module_utils import apiclient, catalog, versionindex
 
-QUERY_PARAMS_LIST = [
-    "version",
-    "only_latest",
-]
+QUERY_PARAMS_LIST = catalog.OPENSHIFT_VERSIONS_QUERY_PARAMS
 
 
 def run_module():
     module_args = dict(
         version=dict(type="str", required=False),
-        only_latest=dict(type="bool", required=False, default=False)
+        only_latest=dict(type="bool", required=False, default=False),
+        cache_ttl=dict(type="int", required=False, default=0),
+        constraint=dict(type="str", required=False),
+        include_prereleases=dict(type="bool", required=False, default=False),
+        latest_per_minor=dict(type="bool", required=False, default=False),
+        support_level=dict(type="list", elements="str", required=False),
+        default_only=dict(type="bool", required=False, default=False),
     )
 
     module = AnsibleModule(argument_spec=module_args, supports_check_mode=False)
 
     # Fail if requests is not installed
-    if not HAS_REQUESTS:
-        module.fail_json(msg=missing_required_lib('requests'), exception=REQUESTS_IMPORT_ERROR)
+    if not apiclient.HAS_REQUESTS:
+        module.fail_json(msg=missing_required_lib('requests'), exception=apiclient.REQUESTS_IMPORT_ERROR)
 
-    # Set headers
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {apitoken.GetToken()}'
-    }
+    client = apiclient.GetClient(module)
+
+    try:
+        versions = catalog.GetOpenShiftVersions(client, module.params, ttl=module.params.get("cache_ttl"))
+    except apiclient.ApiError as e:
+        result = dict(changed=True, response=e.response.text)
+        module.fail_json(msg="Error querying openshift versions", **result)
 
-    query_params = {}
+    # Without any filter the versions are returned as the API lists them,
+    # pre-releases included
+    filtered = any(module.params.get(k) for k in ("constraint", "support_level", "default_only", "latest_per_minor"))
 
-    for k in QUERY_PARAMS_LIST:
-        val = module.params.get(k)
-        if val:
-            query_params = query_params | {k: val}
+    index = versionindex.VersionIndex(versions)
+    try:
+        selected = index.select(
+            constraint=module.params.get("constraint"),
+            support_levels=module.params.get("support_level"),
+            default_only=module.params.get("default_only"),
+            include_prereleases=module.params.get("include_prereleases") or not filtered,
+            latest_per_minor=module.params.get("latest_per_minor"),
+        )
+    except ValueError as e:
+        module.fail_json(msg=str(e))
 
-    response = requests.get(
-        apiurl.GetURL("/openshift-versions"),
-        params=query_params,
-        headers=headers,
-    )
+    if filtered:
+        versions = {v.release: versions[v.release] for v in selected}
 
-    if not response.ok:
-        result = dict(changed=True, response=response.text)
-        module.fail_json(msg="Error querying openshift versions", **result)
+    result = dict(versions=versions, sorted_versions=[v.release for v in selected])
+
+    if selected:
+        result["latest"] = versionindex.Latest(selected)
 
-    module.exit_json(versions=response.json())
+    module.exit_json(**result)
 
 
 def main():
@@ -13,7 +13,10 @@ short_description: Query OpenShift support levels
 
 version_added: "1.0.0"
 
-description: Query supported architectures or features for a given OpenShift version
+description:
+  - Query supported architectures or features for a given OpenShift version
+  - O(openshift_version), O(cpu_architecture) and O(platform_type) accept lists, in which case every combination is
+    queried concurrently and the results are returned in RV(matrix).
 
 options:
   resource_type:
@@ -23,28 +26,46 @@ options:
     type: str
 
   openshift_version:
-    description: Version of OpenShift
+    description: Version of OpenShift, or list of versions
     required: True
-    type: str
+    type: list
+    elements: str
 
   cpu_architecture:
-    description: The CPU architecture of the OpenShift version
+    description: The CPU architecture of the OpenShift version, or list of architectures
     required: False
     choices: [x86_64, aarch64, arm64, ppc64le, s390x, multi]
-    default: x86_64
-    type: str
+    default: [x86_64]
+    type: list
+    elements: str
 
   platform_type:
-    description: The provider platform type
+    description: The provider platform type, or list of platform types
     required: False
     choices: [baremetal, none, nutanix, vsphere, external]
-    type: str
+    type: list
+    elements: str
 
   external_platform_name:
     description: External platform name when platform_type is external
     required: False
     type: str
 
+  cache_ttl:
+    description:
+      - Reuse the response of an identical query made less than this number of seconds ago from the local
+        response cache in C(~/.cache/assisted_installer) (or C(AI_CACHE_DIR)), without any request to the API.
+      - Expired responses are revalidated with a conditional request. V(0) disables the cache.
+    required: False
+    default: 0
+    type: int
+
+  parallelism:
+    description: Maximum number of concurrent queries when several combinations are queried.
+    required: False
+    default: 8
+    type: int
+
 author:
     - Chris Wheeler (@clwheel)
 """
@@ -62,14 +83,23 @@ EXAMPLES = r"""
     openshift_version: 4.16.19
     cpu_architecture: x86_64
     platform_type: baremetal
+    cache_ttl: 86400
   register: features_result
+
+- name: Query the OpenShift features matrix
+  support_levels:
+    resource_type: features
+    openshift_version: ["4.15", "4.16", "4.17"]
+    cpu_architecture: [x86_64, arm64]
+    platform_type: [baremetal, none]
+  register: features_matrix
 """
 
 RETURN = r"""
 architectures:
   description: A list of supported OpenShift architectures
   type: dict
-  returned: always
+  returned: when O(resource_type=architectures) and a single combination is queried
   sample: { "ARM64_ARCHITECTURE": "supported",
             "MULTIARCH_RELEASE_IMAGE": "tech-preview",
             "PPC64LE_ARCHITECTURE": "supported",
@@ -79,7 +109,7 @@ architectures:
 features:
   description: A list of supported OpenShift features
   type: dict
-  returned: always
+  returned: when O(resource_type=features) and a single combination is queried
   sample: { "CLUSTER_MANAGED_NETWORKING": "supported",
             "CNV": "supported",
             "CUSTOM_MANIFEST": "supported",
@@ -99,70 +129,99 @@ features:
             "SNO": "supported",
             "USER_MANAGED_NETWORKING": "supported",
             "VIP_AUTO_ALLOC": "unavailable" }
+
+matrix:
+  description:
+    - Support levels of every queried combination.
+    - For O(resource_type=architectures), indexed by OpenShift version.
+    - For O(resource_type=features), indexed by OpenShift version, CPU architecture and platform type, V(default)
+      standing for no O(platform_type).
+  type: dict
+  returned: always
+  sample: { "4.16": { "x86_64": { "baremetal": { "CNV": "supported", "LVM": "supported" } } } }
 """
 
+import itertools
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import missing_required_lib
 
-import traceback
-
 try:
-    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apitoken
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient, catalog, fanout
 except ImportError:
-    from ansible.module_utils import apitoken
+    from ansible.module_utils import apiclient, catalog, fanout
 
-try:
-    import requests
-except ImportError:
-    HAS_REQUESTS = False
-    REQUESTS_IMPORT_ERROR = traceback.format_exc()
-else:
-    HAS_REQUESTS = True
-    REQUESTS_IMPORT_ERROR = None
-
-API_VERSION = "v2"
-API_URL = f"https://api.openshift.com/api/assisted-install/{API_VERSION}"
-QUERY_PARAMS_LIST = {"architectures": ["openshift_version"],
-                     "features": ["openshift_version", "cpu_architecture", "platform_type", "external_platform_name"]}
+QUERY_PARAMS_LIST = catalog.SUPPORT_LEVELS_QUERY_PARAMS
 
 
 def run_module():
     module_args = dict(
         resource_type=dict(type="str", required=True, choices=["architectures", "features"]),
-        openshift_version=dict(type="str", required=True),
-        cpu_architecture=dict(type="str", required=False, default="x86_64", choices=["x86_64", "aarch64", "arm64", "ppc64le", "s390x", "multi"]),
-        platform_type=dict(type="str", required=False, choices=["baremetal", "none", "nutanix", "vsphere", "external"]),
-        external_platform_name=dict(type="str", required=False)
+        openshift_version=dict(type="list", elements="str", required=True),
+        cpu_architecture=dict(type="list", elements="str", required=False, default=["x86_64"],
+                              choices=["x86_64", "aarch64", "arm64", "ppc64le", "s390x", "multi"]),
+        platform_type=dict(type="list", elements="str", required=False, choices=["baremetal", "none", "nutanix", "vsphere", "external"]),
+        external_platform_name=dict(type="str", required=False),
+        cache_ttl=dict(type="int", required=False, default=0),
+        parallelism=dict(type="int", required=False, default=fanout.DEFAULT_WORKERS),
     )
 
-    token = apitoken.GetToken()
     module = AnsibleModule(argument_spec=module_args, supports_check_mode=False)
 
     # Fail if requests is not installed
-    if not HAS_REQUESTS:
-        module.fail_json(msg=missing_required_lib('requests'), exception=REQUESTS_IMPORT_ERROR)
+    if not apiclient.HAS_REQUESTS:
+        module.fail_json(msg=missing_required_lib('requests'), exception=apiclient.REQUESTS_IMPORT_ERROR)
 
-    # Set headers
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {token}'
-    }
+    client = apiclient.GetClient(module)
 
     resource_type = module.params.get('resource_type')
-    query_params = {}
-
-    for k in QUERY_PARAMS_LIST[resource_type]:
-        val = module.params.get(k)
-        if val:
-            query_params = query_params | {k: val}
-
-    response = requests.get(f"{API_URL}/support-levels/{resource_type}", params=query_params, headers=headers)
-
-    if not response.ok:
-        result = dict(changed=True, response=response.text)
-        module.fail_json(msg=f"Error querying {resource_type}", **result)
 
-    result = response.json()
+    # Every combination of the requested versions, architectures and
+    # platforms, along with the query parameters actually sent for it:
+    # architectures only depend on the version, so many combinations share
+    # the same query.
+    combinations = []
+    for version, arch, platform in itertools.product(
+        module.params.get("openshift_version"),
+        module.params.get("cpu_architecture"),
+        module.params.get("platform_type") or [None],
+    ):
+        params = module.params | dict(openshift_version=version, cpu_architecture=arch, platform_type=platform)
+        query = apiclient.BuildQuery(params, QUERY_PARAMS_LIST[resource_type])
+        combinations.append((version, arch, platform, query))
+
+    queries = []
+    for version, arch, platform, query in combinations:
+        if query not in queries:
+            queries.append(query)
+
+    def get_support_levels(query):
+        return catalog.GetSupportLevels(client, resource_type, query, ttl=module.params.get("cache_ttl"))
+
+    outcomes = fanout.Map(get_support_levels, queries, module.params.get("parallelism"))
+
+    errors = []
+    for outcome in outcomes:
+        if isinstance(outcome.error, apiclient.ApiError):
+            errors.append(dict(query=outcome.item, response=outcome.error.response.text))
+        elif not outcome.ok:
+            errors.append(dict(query=outcome.item, response=str(outcome.error)))
+    if errors:
+        module.fail_json(msg=f"Error querying {resource_type}", changed=True, errors=errors)
+
+    matrix = {}
+    for version, arch, platform, query in combinations:
+        levels = outcomes[queries.index(query)].result.get(resource_type, {})
+        if resource_type == "architectures":
+            matrix[version] = levels
+        else:
+            matrix.setdefault(version, {}).setdefault(arch, {})[platform or "default"] = levels
+
+    result = dict(matrix=matrix)
+
+    # A single combination also returns the API response as is
+    if len(combinations) == 1:
+        result |= outcomes[0].result
 
     module.exit_json(**result)
 
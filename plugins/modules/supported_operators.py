@@ -15,6 +15,16 @@ version_added: "1.0.0"
 
 description: Assisted Service API to retrieve supported operators
 
+options:
+    cache_ttl:
+        description:
+          - Reuse the response of a query made less than this number of seconds ago from the local response cache
+            in C(~/.cache/assisted_installer) (or C(AI_CACHE_DIR)), without any request to the API.
+          - Expired responses are revalidated with a conditional request. V(0) disables the cache.
+        required: false
+        default: 0
+        type: int
+
 author:
     - Tony García (@tonyskapunk)
     - Vishwanath Jayaraman (@vjayaramrh)
@@ -24,6 +34,10 @@ EXAMPLES = r"""
 # Use argument
 - name: List supported operators
   supported_operators:
+
+- name: List supported operators, reusing the response for a day
+  supported_operators:
+    cache_ttl: 86400
 """
 
 RETURN = r"""
@@ -34,57 +48,40 @@ supported_operators:
     sample: ["lso", "odf", "cnv", "lvm", "mce"]
 """
 
-import traceback
-
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.basic import missing_required_lib
 
 try:
-    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apitoken
+    from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient, catalog
 except ImportError:
-    from ansible.module_utils import apitoken
-
-try:
-    import requests
-except ImportError:
-    HAS_REQUESTS = False
-    REQUESTS_IMPORT_ERROR = traceback.format_exc()
-else:
-    HAS_REQUESTS = True
-    REQUESTS_IMPORT_ERROR = None
-
-API_VERSION = "v2"
-API_URL = f"https://api.openshift.com/api/assisted-install/{API_VERSION}"
+    from ansible.module_utils import apiclient, catalog
 
 
 def run_module():
-    module_args = dict()
-    token = apitoken.GetToken()
+    module_args = dict(
+        cache_ttl=dict(type="int", required=False, default=0),
+    )
     module = AnsibleModule(argument_spec=module_args, supports_check_mode=False)
 
     # Fail if requests is not installed
-    if not HAS_REQUESTS:
-        module.fail_json(msg=missing_required_lib('requests'), exception=REQUESTS_IMPORT_ERROR)
+    if not apiclient.HAS_REQUESTS:
+        module.fail_json(msg=missing_required_lib('requests'), exception=apiclient.REQUESTS_IMPORT_ERROR)
 
-    # Set headers
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {token}'
-    }
+    client = apiclient.GetClient(module)
 
     # List supported operators
-    response = requests.get(f"{API_URL}/supported-operators", headers=headers)
-
-    if not response.ok:
+    try:
+        supported_operators = catalog.GetSupportedOperators(client, ttl=module.params.get("cache_ttl"))
+    except apiclient.ApiError as e:
         try:
-            res = response.json()
-        except requests.JSONDecodeError:
-            res = response.text
+            res = e.response.json()
+        except ValueError:
+            res = e.response.text
 
         result = dict(changed=False, response=res, supported_operators=[])
         module.fail_json(msg="Error listing supported operators", **result)
 
-    result = dict(changed=False, supported_operators=response.json())
+    result = dict(changed=False, supported_operators=supported_operators)
 
     module.exit_json(**result)
 
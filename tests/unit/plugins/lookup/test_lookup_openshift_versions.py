@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ansible.errors import AnsibleError  # noqa: E402
+from ansible.plugins.loader import lookup_loader  # noqa: E402
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient  # noqa: E402
+
+# Listed the way the API does, not sorted
+VERSIONS = {
+    "4.16.10-multi": {"display_name": "4.16.10-multi"},
+    "4.16.9": {"display_name": "4.16.9"},
+    "4.16.10": {"display_name": "4.16.10"},
+    "4.17.0-rc.2": {"display_name": "4.17.0-rc.2"},
+}
+
+
+class FakeClient:
+
+    def __init__(self, versions):
+        self.versions = versions
+        self.queries = []
+
+    def get_cached(self, url_path, params=None, ttl=0):
+        self.queries.append((url_path, params, ttl))
+        return self.versions
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient(VERSIONS)
+    monkeypatch.setattr(apiclient, "GetClient", lambda module=None: fake)
+    return fake
+
+
+@pytest.fixture
+def lookup():
+    return lookup_loader.get("openshift_lab.assisted_installer.openshift_versions")
+
+
+def test_versions_per_term(client, lookup):
+    assert lookup.run(["4.16", "4.17"]) == [VERSIONS, VERSIONS]
+    assert client.queries == [
+        ("/openshift-versions", {"version": "4.16"}, 3600),
+        ("/openshift-versions", {"version": "4.17"}, 3600),
+    ]
+
+
+def test_latest(client, lookup):
+    assert lookup.run(["4.16"], latest=True) == ["4.16.10"]
+
+
+def test_latest_with_prereleases(client, lookup):
+    assert lookup.run(["4.17"], latest=True, include_prereleases=True) == ["4.17.0-rc.2"]
+
+
+def test_latest_without_match(client, lookup):
+    client.versions = {"4.20.0-ec.1": {}}
+    with pytest.raises(AnsibleError):
+        lookup.run(["4.20"], latest=True)
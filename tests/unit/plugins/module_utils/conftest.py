@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+try:
+    import requests
+except ImportError:
+    # The fake_server fixture skips the tests using it
+    requests = None
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body=b"", headers=None, fail_after=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.text = ""
+        self.body = body
+        self.fail_after = fail_after
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            if self.fail_after is not None and start >= self.fail_after:
+                raise requests.ConnectionError("connection reset")
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeServer:
+    """Serves data with Range and If-Range support, optionally dropping connections.
+
+    fail_after is a list of byte counts: each GET pops one and breaks its
+    connection once that many bytes of its body were sent.
+    """
+
+    def __init__(self, data, etag='"v1"', ranges=True, fail_after=None):
+        self.data = data
+        self.etag = etag
+        self.ranges = ranges
+        self.fail_after = list(fail_after or [])
+        self.requests = []
+
+    def direct(self):
+        return self
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append((method, headers))
+        size = len(self.data)
+        base = {"ETag": self.etag} if self.etag else {}
+        if self.ranges:
+            base["Accept-Ranges"] = "bytes"
+
+        if method == "HEAD":
+            return FakeResponse(200, headers=base | {"Content-Length": str(size)})
+
+        fail_after = self.fail_after.pop(0) if self.fail_after else None
+        range_header = headers.get("Range")
+        if range_header and self.ranges and headers.get("If-Range", self.etag) == self.etag:
+            first, _, last = range_header[len("bytes="):].partition("-")
+            first, last = int(first), int(last) if last else size - 1
+            if first >= size:
+                return FakeResponse(416, headers=base)
+            return FakeResponse(
+                206,
+                self.data[first:last + 1],
+                base | {"Content-Range": f"bytes {first}-{last}/{size}"},
+                fail_after,
+            )
+        return FakeResponse(200, self.data, base | {"Content-Length": str(size)}, fail_after)
+
+    def gets(self):
+        return [headers for method, headers in self.requests if method == "GET"]
+
+
+@pytest.fixture
+def fake_server():
+    """Return the FakeServer class, for the tests of downloads."""
+    pytest.importorskip("requests")
+    return FakeServer
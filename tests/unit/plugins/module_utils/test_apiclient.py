@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient  # noqa: E402
+
+BASE_URL = "https://api.example.com/api/assisted-install/v2"
+
+
+class FakeConnection:
+    """Answers send_request like the httpapi plugin does."""
+
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+        self.requests = []
+
+    def send_request(self, method, path, data=None, headers=None):
+        self.requests.append((method, path, data))
+        return dict(status_code=self.status_code, headers={"Content-Type": "application/json"}, text=self.body)
+
+
+class DirectClient:
+
+    def __init__(self):
+        self.requests = []
+
+    def _send(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        return apiclient.ConnectionResponse(200, {}, "{}")
+
+
+@pytest.fixture
+def direct(monkeypatch):
+    client = DirectClient()
+    monkeypatch.setattr(apiclient.ConnectionClient, "direct", lambda self: client)
+    return client
+
+
+def test_requests_go_through_the_connection(direct):
+    connection = FakeConnection('{"id": "c1"}')
+    client = apiclient.ConnectionClient(connection, base_url=BASE_URL)
+
+    response = client.post("/clusters", params={"with_hosts": True}, json={"name": "lab1"})
+
+    assert response.ok and response.json() == {"id": "c1"}
+    assert connection.requests == [
+        ("POST", "/api/assisted-install/v2/clusters?with_hosts=True", '{"name": "lab1"}'),
+    ]
+    assert direct.requests == []
+
+
+def test_other_hosts_are_sent_directly(direct):
+    connection = FakeConnection("{}")
+    client = apiclient.ConnectionClient(connection, base_url=BASE_URL)
+
+    client.get("https://images.example.com/discovery.iso")
+
+    assert direct.requests == [("GET", "https://images.example.com/discovery.iso")]
+    assert connection.requests == []
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_array_over_the_connection(direct, monkeypatch, chunk_size):
+    clusters = [{"id": "c1", "name": "café"}, {"id": "c2", "hosts": [{"id": "h1"}]}]
+    connection = FakeConnection(json.dumps(clusters, ensure_ascii=False))
+    client = apiclient.ConnectionClient(connection, base_url=BASE_URL)
+    monkeypatch.setattr(apiclient, "STREAM_CHUNK_SIZE", chunk_size)
+
+    assert list(client.iter_array("/clusters")) == clusters
+
+
+def test_iter_array_error(direct):
+    client = apiclient.ConnectionClient(FakeConnection('{"reason": "forbidden"}', 403), base_url=BASE_URL)
+
+    with pytest.raises(apiclient.ApiError):
+        list(client.iter_array("/clusters"))
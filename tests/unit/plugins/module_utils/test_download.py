@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import download  # noqa: E402
+
+URL = "https://example.com/discovery.iso"
+DATA = bytes(range(256)) * 4096  # 1 MiB
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(download.time, "sleep", lambda seconds: None)
+
+
+def checksum(data=DATA):
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def write_part(dest, data, url=URL, validator='"v1"'):
+    with open(f"{dest}.part", "wb") as f:
+        f.write(data)
+    if validator is not None:
+        with open(f"{dest}.part.json", "w") as f:
+            json.dump(dict(url=url, validator=validator), f)
+
+
+def test_download(fake_server, tmp_path):
+    dest = str(tmp_path / "discovery.iso")
+    result = download.Download(fake_server(DATA), URL, dest, checksum=checksum(), segments=1)
+
+    assert result["changed"]
+    assert result["size"] == len(DATA)
+    assert result["resumed_from"] == 0
+    assert open(dest, "rb").read() == DATA
+    assert sorted(os.listdir(tmp_path)) == ["discovery.iso"]
+
+
+def test_download_unchanged(fake_server, tmp_path):
+    dest = str(tmp_path / "discovery.iso")
+    with open(dest, "wb") as f:
+        f.write(DATA)
+
+    server = fake_server(DATA)
+    assert not download.Download(server, URL, dest, checksum=checksum())["changed"]
+    assert not server.gets()
+
+
+def test_download_checksum_mismatch(fake_server, tmp_path):
+    dest = str(tmp_path / "discovery.iso")
+    with pytest.raises(download.DownloadError):
+        download.Download(fake_server(DATA), URL, dest, checksum=checksum(b"other"), segments=1)
+    assert os.listdir(tmp_path) == []
+
+
+def test_download_resumes_within_run(fake_server, tmp_path):
+    dest = str(tmp_path / "discovery.iso")
+    server = fake_server(DATA, fail_after=[300000, 200000])
+    result = download.Download(server, URL, dest, checksum=checksum(), chunk_size=50000, segments=1)
+
+    assert open(dest, "rb").read() == DATA
+    assert [headers.get("Range") for headers in server.gets()] == [None, "bytes=300000-", "bytes=500000-"]
+    assert result["resumed_from"] == 0
+
+
+def test_download_gives_up_after_retries(fake_server, tmp_path):
+    dest = str(tmp_path / "discovery.iso")
+    server = fake_server(DATA, fail_after=[0] * 3)
+    with pytest.raises(download.DownloadError):
+        download.Download(server, URL, dest, retries=2, segments=1)
+    assert len(server.gets()) == 3
+
+
+def test_download_resumes_part_with_validator(fake_server, tmp_path):
+    dest = str(tmp_path / "discovery.iso")
+    write_part(dest, DATA[:123456])
+
+    server = fake_server(DATA)
+    result = download.Download(server, URL, dest, checksum=checksum(), segments=1)
+
+    assert open(dest, "rb").read() == DATA
+    assert result["resumed_from"] == 123456
+    assert result["transferred"] == len(DATA) - 123456
+    assert server.gets()[0]["Range"] == "bytes=123456-"
+    assert server.gets()[0]["If-Range"] == '"v1"'
+    assert not os.path.exists(f"{dest}.part.json")
+
+
+def test_download_restarts_changed_file(fake_server, tmp_path):
+    dest = str(tmp_path / "discovery.iso")
+    write_part(dest, b"x" * 123456, validator='"v0"')
+
+    result = download.Download(fake_server(DATA), URL, dest, checksum=checksum(), segments=1)
+
+    assert open(dest, "rb").read() == DATA
+    assert result["resumed_from"] == 0
+
+
+@pytest.mark.parametrize("url, validator", [(URL, None), ("https://example.com/other.iso", '"v1"')])
+def test_download_ignores_unvalidated_part(fake_server, tmp_path, url, validator):
+    dest = str(tmp_path / "discovery.iso")
+    write_part(dest, b"x" * len(DATA), url=url, validator=validator)
+
+    server = fake_server(DATA)
+    result = download.Download(server, URL, dest, checksum=checksum(), segments=1)
+
+    assert open(dest, "rb").read() == DATA
+    assert result["resumed_from"] == 0
+    assert "Range" not in server.gets()[0]
+
+
+def test_parallel_download(fake_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download, "PARALLEL_MIN_SIZE", 1024)
+    dest = str(tmp_path / "discovery.iso")
+    server = fake_server(DATA, fail_after=[0, 100000])
+
+    result = download.Download(server, URL, dest, checksum=checksum(), chunk_size=50000, segments=4)
+
+    assert result["segments"] == 4
+    assert open(dest, "rb").read() == DATA
+    assert len(server.gets()) == 6
+    assert all(headers["Range"].startswith("bytes=") for headers in server.gets())
+    assert sorted(os.listdir(tmp_path)) == ["discovery.iso"]
+
+
+def test_parallel_download_failure_leaves_no_part(fake_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download, "PARALLEL_MIN_SIZE", 1024)
+    dest = str(tmp_path / "discovery.iso")
+    server = fake_server(DATA, fail_after=[0] * 100)
+
+    with pytest.raises(download.DownloadError):
+        download.Download(server, URL, dest, retries=1, segments=4)
+
+    # A preallocated file must never be taken for a resumable .part
+    assert os.listdir(tmp_path) == []
+
+
+def test_small_or_unranged_files_are_streamed(fake_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download, "PARALLEL_MIN_SIZE", 1024)
+    dest = str(tmp_path / "discovery.iso")
+
+    result = download.Download(fake_server(DATA, ranges=False), URL, dest, checksum=checksum(), segments=4)
+
+    assert result["segments"] == 1
+    assert open(dest, "rb").read() == DATA
+
+
+def test_known_head_is_not_requested_again(fake_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download, "PARALLEL_MIN_SIZE", 1024)
+    dest = str(tmp_path / "discovery.iso")
+    server = fake_server(DATA)
+    head = download.Head(server, URL)
+
+    result = download.Download(server, URL, dest, checksum=checksum(), segments=4, head=head)
+
+    assert result["segments"] == 4
+    assert [method for method, headers in server.requests].count("HEAD") == 1
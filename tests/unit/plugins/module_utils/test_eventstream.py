@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import eventstream
+
+
+def event(second, name="host_registered", message=""):
+    return dict(event_time=f"2024-11-08T20:15:{second:02d}Z", name=name, message=message)
+
+
+class FakeClient:
+    """Serves events from a list the way ApiClient.iter_pages does."""
+
+    def __init__(self, events):
+        self.events = events
+        self.requests = []
+
+    def iter_pages(self, url_path, params=None, page_size=100, offset=0):
+        while True:
+            self.requests.append((url_path, dict(params or {}), offset, page_size))
+            page = self.events[offset:offset + page_size]
+            yield from page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+
+def follow(client, cursor, **kwargs):
+    stream = eventstream.FollowStream(client, {"cluster_id": "c1"}, cursor, **kwargs)
+    return list(stream), stream
+
+
+def test_follow_from_scratch():
+    events = [event(1), event(2), event(2, message="other"), event(3)]
+    client = FakeClient(events)
+
+    seen, stream = follow(client, {}, page_size=2)
+
+    assert seen == events
+    assert not stream.truncated
+    assert stream.cursor["offset"] == 4
+    assert stream.cursor["event_time"] == events[-1]["event_time"]
+    assert client.requests[0] == ("/events", {"cluster_id": "c1", "order": "ascending"}, 0, 2)
+
+
+def test_follow_resumes_from_cursor():
+    events = [event(1), event(2), event(3)]
+    _, stream = follow(FakeClient(events), {})
+
+    events += [event(4), event(5)]
+    client = FakeClient(events)
+    seen, stream = follow(client, stream.cursor)
+
+    assert seen == events[3:]
+    assert client.requests[0][2] == 3
+    assert stream.cursor["offset"] == 5
+
+
+def test_follow_skips_seen_events_when_offset_drifts():
+    events = [event(1), event(2), event(2, message="other")]
+    _, stream = follow(FakeClient(events), {})
+
+    # The oldest event was pruned: the stored offset now skips a new event
+    # and the events at the cursor time are returned again
+    events = events[1:] + [event(2, message="late"), event(3)]
+    cursor = dict(stream.cursor, offset=1)
+    seen, stream = follow(FakeClient(events), cursor)
+
+    assert seen == [event(2, message="late"), event(3)]
+    assert stream.cursor["event_time"] == event(3)["event_time"]
+    assert stream.cursor["seen"] == [eventstream.EventKey(event(3))]
+
+
+def test_follow_limit_truncates_and_keeps_position():
+    events = [event(s) for s in range(10)]
+    seen, stream = follow(FakeClient(events), {}, limit=4)
+
+    assert seen == events[:4]
+    assert stream.truncated
+
+    seen, stream = follow(FakeClient(events), stream.cursor)
+    assert seen == events[4:]
+    assert not stream.truncated
+
+
+def test_follow_does_not_update_the_given_cursor():
+    cursor = {}
+    follow(FakeClient([event(1)]), cursor)
+    assert cursor == {}
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import os
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import isocache  # noqa: E402
+
+URL = "https://images.example.com/bytoken/abc/4.16/x86_64/minimal.iso"
+DATA = bytes(range(256)) * 1024
+OTHER = bytes(reversed(range(256))) * 1024
+KEY = isocache.ImageKey(dict(openshift_version="4.16", cpu_architecture="x86_64", type="minimal-iso"))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return isocache.IsoCache(directory=str(tmp_path / "cache"))
+
+
+def checksum(data):
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def methods(server):
+    return [method for method, headers in server.requests]
+
+
+def test_image_key():
+    assert KEY == "4.16-x86_64-minimal-iso"
+
+
+def test_miss_downloads_with_one_head(fake_server, cache, tmp_path):
+    server = fake_server(DATA)
+    dest = str(tmp_path / "a.iso")
+
+    result = isocache.CachedDownload(server, URL, dest, KEY, cache)
+
+    assert not result["cached"]
+    assert open(dest, "rb").read() == DATA
+    assert methods(server) == ["HEAD", "GET"]
+    entry, blob = cache.get(KEY)
+    assert entry == dict(digest=hashlib.sha256(DATA).hexdigest(), size=len(DATA), etag='"v1"')
+
+
+def test_same_etag_reuses_a_copy(fake_server, cache, tmp_path):
+    isocache.CachedDownload(fake_server(DATA), URL, str(tmp_path / "a.iso"), KEY, cache)
+    server = fake_server(DATA)
+    dest = str(tmp_path / "b.iso")
+
+    result = isocache.CachedDownload(server, URL, dest, KEY, cache)
+
+    assert result["cached"] and result["changed"]
+    assert methods(server) == ["HEAD"]
+    assert open(dest, "rb").read() == DATA
+    # dest is a copy, modifying it leaves the cache alone
+    assert os.stat(dest).st_ino != os.stat(cache.get(KEY)[1]).st_ino
+
+    result = isocache.CachedDownload(fake_server(DATA), URL, dest, KEY, cache)
+    assert result["cached"] and not result["changed"]
+
+
+@pytest.mark.parametrize("etag", [None, 'W/"v1"'])
+def test_same_size_without_strong_etag_is_downloaded(fake_server, cache, tmp_path, etag):
+    # Another infra-env with the same image key and size, but its own ignition
+    isocache.CachedDownload(fake_server(DATA, etag=etag), URL, str(tmp_path / "a.iso"), KEY, cache)
+    server = fake_server(OTHER, etag=etag)
+    dest = str(tmp_path / "b.iso")
+
+    result = isocache.CachedDownload(server, URL, dest, KEY, cache)
+
+    assert not result["cached"]
+    assert open(dest, "rb").read() == OTHER
+    assert methods(server) == ["HEAD", "GET"]
+
+
+def test_changed_etag_is_downloaded(fake_server, cache, tmp_path):
+    isocache.CachedDownload(fake_server(DATA), URL, str(tmp_path / "a.iso"), KEY, cache)
+    dest = str(tmp_path / "b.iso")
+
+    result = isocache.CachedDownload(fake_server(OTHER, etag='"v2"'), URL, dest, KEY, cache)
+
+    assert not result["cached"]
+    assert open(dest, "rb").read() == OTHER
+    assert cache.get(KEY)[0]["etag"] == '"v2"'
+
+
+def test_checksum_reuses_without_head(fake_server, cache, tmp_path):
+    isocache.CachedDownload(fake_server(DATA, etag=None), URL, str(tmp_path / "a.iso"), KEY, cache)
+    server = fake_server(DATA, etag=None)
+    dest = str(tmp_path / "b.iso")
+
+    result = isocache.CachedDownload(server, URL, dest, KEY, cache, checksum=checksum(DATA))
+
+    assert result["cached"]
+    assert server.requests == []
+
+
+def test_checksum_mismatch_is_downloaded(fake_server, cache, tmp_path):
+    isocache.CachedDownload(fake_server(DATA), URL, str(tmp_path / "a.iso"), KEY, cache)
+    server = fake_server(OTHER)
+    dest = str(tmp_path / "b.iso")
+
+    result = isocache.CachedDownload(server, URL, dest, KEY, cache, checksum=checksum(OTHER))
+
+    assert not result["cached"]
+    assert open(dest, "rb").read() == OTHER
+    assert methods(server) == ["HEAD", "GET"]
+
+
+def test_eviction(fake_server, tmp_path):
+    cache = isocache.IsoCache(directory=str(tmp_path / "cache"), max_bytes=len(DATA) + len(OTHER) // 2)
+    other_key = KEY.replace("4.16", "4.17")
+    isocache.CachedDownload(fake_server(DATA), URL, str(tmp_path / "a.iso"), KEY, cache)
+    os.utime(cache.get(KEY)[1], (0, 0))
+
+    isocache.CachedDownload(fake_server(OTHER, etag='"v2"'), URL, str(tmp_path / "b.iso"), other_key, cache)
+
+    assert cache.get(KEY) == (None, None)
+    assert cache.get(other_key)[0]["etag"] == '"v2"'
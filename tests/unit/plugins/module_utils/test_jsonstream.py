@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+import pytest
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import jsonstream
+
+DOCUMENT = [
+    {"id": "a", "name": "sno-1", "hosts": [{"id": "h1", "tags": ["x", "y"]}, {"id": "h2", "tags": []}]},
+    {"id": "b", "name": "quote \" and backslash \\ and [brackets] {braces}", "hosts": []},
+    {"id": "c", "name": "café ☃", "count": 12, "ratio": -1.5e3, "ok": True, "missing": None},
+    "plain string",
+    42,
+    [],
+    {},
+]
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16, 64, 4096])
+def test_iter_array_arbitrary_chunks(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+    assert list(jsonstream.IterArray(split(data, size))) == DOCUMENT
+
+
+@pytest.mark.parametrize("size", [1, 3, 8])
+def test_iter_array_text_and_whitespace(size):
+    data = json.dumps(DOCUMENT, indent=2)
+    assert list(jsonstream.IterArray(split(data, size))) == DOCUMENT
+
+
+def test_iter_array_multibyte_character_split():
+    data = json.dumps(["☃"], ensure_ascii=False).encode("utf-8")
+    # Every split point, including inside the 3 bytes of the character
+    for i in range(1, len(data)):
+        assert list(jsonstream.IterArray([data[:i], data[i:]])) == ["☃"]
+
+
+@pytest.mark.parametrize("data", [b"[]", b" [ ] ", b"[\n]"])
+def test_iter_array_empty(data):
+    assert list(jsonstream.IterArray(split(data, 1))) == []
+
+
+@pytest.mark.parametrize("data", [b"", b"{}", b'[{"a": 1}', b'[{"a": 1} {"b": 2}]', b'["unterminated'])
+def test_iter_array_invalid(data):
+    with pytest.raises(ValueError):
+        list(jsonstream.IterArray(split(data, 2)))
+
+
+def test_iter_array_is_lazy():
+    def chunks():
+        yield b'[{"id": 1},'
+        yield b' {"id": 2}'
+        raise AssertionError("read past the requested elements")
+
+    elements = jsonstream.IterArray(chunks())
+    assert next(elements) == {"id": 1}
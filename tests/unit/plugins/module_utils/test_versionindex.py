@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import versionindex
+
+VERSIONS = {
+    "4.15.30": {"support_level": "maintenance"},
+    "4.16.9": {"support_level": "production"},
+    "4.16.10": {"support_level": "production", "default": True},
+    "4.16.10-multi": {"support_level": "production"},
+    "4.17.0-rc.9": {"support_level": "beta"},
+    "4.17.0-rc.10": {"support_level": "beta"},
+    "4.17.0": {"support_level": "production"},
+    "not-a-version": {},
+}
+
+
+def releases(versions):
+    return [v.release for v in versions]
+
+
+@pytest.mark.parametrize("release, expected", [
+    ("4.16.10", (4, 16, 10, None, False)),
+    ("4.16", (4, 16, 0, None, False)),
+    ("4.19.0-ec.3", (4, 19, 0, "ec.3", False)),
+    ("4.18.1-multi", (4, 18, 1, None, True)),
+    ("4.19.0-rc.2-multi", (4, 19, 0, "rc.2", True)),
+])
+def test_version_parse(release, expected):
+    v = versionindex.Version(release)
+    assert (v.major, v.minor, v.patch, v.prerelease, v.multi) == expected
+
+
+def test_version_invalid():
+    with pytest.raises(ValueError):
+        versionindex.Version("latest")
+
+
+def test_version_ordering():
+    ordered = ["4.9.1", "4.16.9", "4.16.10", "4.17.0-ec.1", "4.17.0-rc.2", "4.17.0-rc.10", "4.17.0"]
+    assert sorted(ordered[::-1], key=lambda r: versionindex.Version(r).key) == ordered
+
+
+@pytest.mark.parametrize("constraint, release, matches", [
+    (">=4.15,<4.17", "4.16.10", True),
+    (">=4.15,<4.17", "4.17.0", False),
+    ("4.16", "4.16.9", True),
+    ("4.16", "4.17.0", False),
+    ("4.16.9", "4.16.10", False),
+    ("!=4.16.9", "4.16.10", True),
+    ("> 4.16.9", "4.16.10", True),
+])
+def test_parse_constraint(constraint, release, matches):
+    assert versionindex.ParseConstraint(constraint)(versionindex.Version(release)) is matches
+
+
+def test_parse_constraint_invalid():
+    with pytest.raises(ValueError):
+        versionindex.ParseConstraint(">=4.15 <4.17")
+
+
+def test_select_sorted_and_skips_unknown_names():
+    index = versionindex.VersionIndex(VERSIONS)
+    assert releases(index.select(include_prereleases=True)) == [
+        "4.15.30", "4.16.9", "4.16.10", "4.16.10-multi", "4.17.0-rc.9", "4.17.0-rc.10", "4.17.0",
+    ]
+
+
+def test_select_excludes_prereleases_without_filters():
+    index = versionindex.VersionIndex(VERSIONS)
+    assert not [v for v in index.select() if v.prerelease]
+
+
+def test_select_constraint_and_prereleases():
+    index = versionindex.VersionIndex(VERSIONS)
+    assert releases(index.select(constraint=">=4.17.0-rc.1")) == ["4.17.0"]
+    assert releases(index.select(constraint=">=4.17.0-rc.1", include_prereleases=True)) == [
+        "4.17.0-rc.9", "4.17.0-rc.10", "4.17.0",
+    ]
+
+
+def test_select_support_level_and_default():
+    index = versionindex.VersionIndex(VERSIONS)
+    assert releases(index.select(support_levels=["maintenance"])) == ["4.15.30"]
+    assert releases(index.select(default_only=True)) == ["4.16.10"]
+
+
+def test_select_latest_per_minor():
+    index = versionindex.VersionIndex(VERSIONS)
+    assert releases(index.select(latest_per_minor=True)) == ["4.15.30", "4.16.10", "4.16.10-multi", "4.17.0"]
+
+
+@pytest.mark.parametrize("versions, expected", [
+    (VERSIONS, "4.17.0"),
+    ({"4.16.10-multi": {}, "4.16.9-multi": {}}, "4.16.10-multi"),
+    ({"4.16.10-multi": {}, "4.16.9": {}}, "4.16.9"),
+    ({}, None),
+])
+def test_latest(versions, expected):
+    assert versionindex.Latest(versionindex.VersionIndex(versions).select()) == expected
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import contextlib
+import io
+import json
+from urllib.parse import urlsplit
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from ansible.module_utils import basic  # noqa: E402
+from ansible.module_utils.common.text.converters import to_bytes  # noqa: E402
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import apiclient  # noqa: E402
+
+try:
+    from ansible.module_utils.testing import patch_module_args
+except ImportError:
+    # ansible-core < 2.19
+    @contextlib.contextmanager
+    def patch_module_args(args=None):
+        serialized = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args or {}}))
+        original = basic._ANSIBLE_ARGS
+        basic._ANSIBLE_ARGS = serialized
+        try:
+            yield
+        finally:
+            basic._ANSIBLE_ARGS = original
+
+BASE_URL = "https://api.example.com/api/assisted-install/v2"
+
+
+class ModuleExit(Exception):
+    """Raised instead of exiting the process by exit_json and fail_json."""
+
+    def __init__(self, result):
+        super().__init__(result)
+        self.result = result
+
+
+def make_response(status_code, body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    # Read from raw so that streamed responses work as well
+    response.raw = io.BytesIO(b"" if body is None else json.dumps(body).encode("utf-8"))
+    response.headers.update(headers or {})
+    return response
+
+
+class FakeApi(apiclient.ApiClient):
+    """ApiClient answering from routes instead of the network.
+
+    routes maps (method, path) to a (status_code, body) tuple, or to a
+    function of the request keyword arguments returning one. Every request
+    is recorded in requests as (method, path, kwargs).
+    """
+
+    def __init__(self, routes=None):
+        self.base_url = BASE_URL
+        self.timeout = apiclient.DEFAULT_TIMEOUT
+        self.retries = 0
+        self.rate_limiter = None
+        self.renew_token = False
+        self.routes = dict(routes or {})
+        self.requests = []
+
+    def _send(self, method, url, **kwargs):
+        path = urlsplit(url).path[len(urlsplit(BASE_URL).path):]
+        self.requests.append((method, path, kwargs))
+
+        route = self.routes.get((method, path))
+        if route is None:
+            return make_response(404, {"reason": f"{method} {path} not found"})
+        status_code, body = route(**kwargs) if callable(route) else route
+        return make_response(status_code, body)
+
+    def sent(self, method=None, path=None):
+        return [r for r in self.requests if (method is None or r[0] == method) and (path is None or r[1] == path)]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def local_state(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AI_PULL_SECRET", "{}")
+    monkeypatch.delenv("AI_API_RATE", raising=False)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    fake = FakeApi()
+    monkeypatch.setattr(apiclient, "GetClient", lambda module=None: fake)
+    return fake
+
+
+@pytest.fixture
+def run_module(monkeypatch):
+    """Run the main() of a module with args, return its result with failed set when it failed."""
+
+    def exit_json(self, **kwargs):
+        kwargs.setdefault("changed", False)
+        raise ModuleExit(kwargs)
+
+    def fail_json(self, msg, **kwargs):
+        kwargs.update(failed=True, msg=msg)
+        raise ModuleExit(kwargs)
+
+    monkeypatch.setattr(basic.AnsibleModule, "exit_json", exit_json)
+    monkeypatch.setattr(basic.AnsibleModule, "fail_json", fail_json)
+
+    def run(module, args):
+        with patch_module_args(args):
+            with pytest.raises(ModuleExit) as e:
+                module.main()
+        return e.value.result
+
+    return run
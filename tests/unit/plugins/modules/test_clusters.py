@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.modules import clusters
+
+
+def host(host_id, hostname):
+    return dict(id=host_id, requested_hostname=hostname, role="master", status="known", inventory="{...}")
+
+
+def cluster(cluster_id, name, status="ready", updated_at="2024-11-08T20:15:44.447Z",
+            created_at="2024-11-01T00:00:00Z", hosts=None):
+    return dict(
+        id=cluster_id,
+        name=name,
+        status=status,
+        openshift_version="4.16.9",
+        created_at=created_at,
+        updated_at=updated_at,
+        hosts=[host(f"{cluster_id}-h1", "master-0")] if hosts is None else hosts,
+    )
+
+
+def serve_details(api, *details):
+    for detail in details:
+        api.routes[("GET", f"/clusters/{detail['id']}")] = (200, detail)
+
+
+class TestGetClusters:
+
+    def test_fields_drop_hosts(self, api, run_module):
+        serve_details(api, cluster("c1", "lab1"))
+
+        result = run_module(clusters, dict(cluster_ids=["c1"], fields=["id", "name", "status"]))
+
+        assert result["clusters"] == [dict(id="c1", cluster=dict(id="c1", name="lab1", status="ready"), failed=False)]
+
+    def test_no_fields_drop_hosts(self, api, run_module):
+        serve_details(api, cluster("c1", "lab1"))
+
+        result = run_module(clusters, dict(cluster_ids=["c1"]))
+
+        assert "hosts" not in result["clusters"][0]["cluster"]
+        assert result["clusters"][0]["cluster"]["name"] == "lab1"
+
+    @pytest.mark.parametrize("args", [dict(with_hosts=True), dict(host_fields=["id", "role"])])
+    def test_hosts_when_requested(self, api, run_module, args):
+        serve_details(api, cluster("c1", "lab1"))
+
+        result = run_module(clusters, dict(cluster_ids=["c1"], fields=["id"]) | args)
+
+        hosts = result["clusters"][0]["cluster"]["hosts"]
+        assert [h["id"] for h in hosts] == ["c1-h1"]
+        if "host_fields" in args:
+            assert hosts == [dict(id="c1-h1", role="master")]
+
+    def test_hosts_for_some_clusters(self, api, run_module):
+        serve_details(api, cluster("c1", "lab1"), cluster("c2", "lab2"))
+
+        result = run_module(clusters, dict(cluster_ids=["c1", "c2"], fields=["id"], with_hosts_for=["c2"]))
+
+        assert [c["cluster"] for c in result["clusters"]] == [
+            dict(id="c1"),
+            dict(id="c2", hosts=[host("c2-h1", "master-0")]),
+        ]
+
+    def test_failures_do_not_stop_the_others(self, api, run_module):
+        serve_details(api, cluster("c1", "lab1"))
+
+        result = run_module(clusters, dict(cluster_ids=["missing", "c1"], fields=["id"]))
+
+        assert result["failed"]
+        assert [(c["id"], c["failed"]) for c in result["clusters"]] == [("missing", True), ("c1", False)]
+
+
+class TestDelta:
+
+    def poll(self, api, run_module, listed, **args):
+        api.routes[("GET", "/clusters")] = (200, [{k: v for k, v in c.items() if k != "hosts"} for c in listed])
+        serve_details(api, *listed)
+        api.requests.clear()
+        return run_module(clusters, dict(delta=True) | args)
+
+    def test_first_run_adds_everything(self, api, run_module):
+        result = self.poll(api, run_module, [cluster("c1", "lab1"), cluster("c2", "lab2")], fields=["id", "name"])
+
+        assert result["added"] == [dict(id="c1", name="lab1"), dict(id="c2", name="lab2")]
+        assert result["updated"] == [] and result["removed"] == []
+
+    def test_only_changes_are_retrieved(self, api, run_module):
+        self.poll(api, run_module, [cluster("c1", "lab1"), cluster("c2", "lab2"), cluster("c3", "lab3")])
+
+        result = self.poll(api, run_module, [
+            cluster("c1", "lab1"),
+            cluster("c2", "lab2", status="installing", updated_at="2024-11-08T21:00:00Z"),
+            cluster("c4", "lab4"),
+        ], fields=["id", "status"])
+
+        assert result["added"] == [dict(id="c4", status="ready")]
+        assert result["updated"] == [dict(id="c2", status="installing")]
+        assert result["removed"] == [dict(id="c3", name="lab3")]
+        assert sorted(path for method, path, kwargs in api.sent("GET")) == ["/clusters", "/clusters/c2", "/clusters/c4"]
+
+    def test_unchanged(self, api, run_module):
+        self.poll(api, run_module, [cluster("c1", "lab1")])
+        result = self.poll(api, run_module, [cluster("c1", "lab1")])
+
+        assert result == dict(added=[], updated=[], removed=[], changed=False)
+        assert [path for method, path, kwargs in api.sent()] == ["/clusters"]
+
+    def test_hosts_only_when_requested(self, api, run_module):
+        result = self.poll(api, run_module, [cluster("c1", "lab1")], fields=["id"])
+        assert result["added"] == [dict(id="c1")]
+
+        result = self.poll(api, run_module, [cluster("c2", "lab2")], fields=["id"], host_fields=["id"])
+        assert result["added"] == [dict(id="c2", hosts=[dict(id="c2-h1")])]
+
+    def test_one_snapshot_per_filter(self, api, run_module):
+        self.poll(api, run_module, [cluster("c1", "lab1"), cluster("c2", "ci-2")], name_pattern="ci-*")
+
+        result = self.poll(api, run_module, [cluster("c1", "lab1"), cluster("c2", "ci-2")])
+
+        assert [c["id"] for c in result["added"]] == ["c1", "c2"]
+
+
+@pytest.mark.parametrize("args", [
+    dict(state="absent", cluster_id="c1", name_pattern="ci-*"),
+    dict(state="absent", cluster_id="c1", older_than_hours=24),
+    dict(state="absent", cluster_id="c1", status=["ready"]),
+    dict(state="present", openshift_version="4.16", clusters_spec=[dict(name="lab1")], wait_for_status=["ready"]),
+])
+def test_ignored_combinations_are_rejected(api, run_module, args):
+    result = run_module(clusters, args)
+
+    assert result["failed"]
+    assert "mutually exclusive" in result["msg"]
+    assert api.requests == []
+
+
+class TestList:
+
+    def serve_list(self, api, listed):
+        def handler(params=None, **kwargs):
+            if (params or {}).get("with_hosts"):
+                return 200, listed
+            return 200, [{k: v for k, v in c.items() if k != "hosts"} for c in listed]
+
+        api.routes[("GET", "/clusters")] = handler
+        serve_details(api, *listed)
+
+    def test_list(self, api, run_module):
+        listed = [cluster("c1", "lab1"), cluster("c2", "lab2")]
+        self.serve_list(api, listed)
+
+        result = run_module(clusters, dict())
+
+        assert [c["id"] for c in result["clusters"]] == ["c1", "c2"]
+        assert "hosts" not in result["clusters"][0]
+
+    def test_fields_and_status(self, api, run_module):
+        self.serve_list(api, [cluster("c1", "lab1", status="installed"), cluster("c2", "lab2")])
+
+        result = run_module(clusters, dict(status=["installed"], fields=["id", "name", "status"]))
+
+        assert result["clusters"] == [dict(id="c1", name="lab1", status="installed")]
+
+    def test_empty_status_does_not_filter(self, api, run_module):
+        self.serve_list(api, [cluster("c1", "lab1", status="installed"), cluster("c2", "lab2")])
+
+        result = run_module(clusters, dict(status=[], fields=["id"]))
+
+        assert result["clusters"] == [dict(id="c1"), dict(id="c2")]
+
+    def test_host_fields(self, api, run_module):
+        self.serve_list(api, [cluster("c1", "lab1")])
+
+        result = run_module(clusters, dict(with_hosts=True, fields=["id"], host_fields=["requested_hostname", "role"]))
+
+        assert result["clusters"] == [dict(id="c1", hosts=[dict(requested_hostname="master-0", role="master")])]
+
+    def test_hosts_for_some_clusters(self, api, run_module):
+        self.serve_list(api, [cluster("c1", "lab1"), cluster("c2", "lab2")])
+
+        result = run_module(clusters, dict(fields=["id"], host_fields=["id"], with_hosts_for=["c2"]))
+
+        assert result["clusters"] == [dict(id="c1"), dict(id="c2", hosts=[dict(id="c2-h1")])]
+        # The list itself is retrieved without the hosts of every cluster
+        assert [(path, kwargs.get("params")) for method, path, kwargs in api.sent("GET")] == [
+            ("/clusters", {}),
+            ("/clusters/c2", None),
+        ]
+
+
+class TestRegister:
+
+    @pytest.fixture
+    def registrations(self, api):
+        def handler(json=None, **kwargs):
+            if json["name"] == "taken":
+                return 409, {"reason": "name already used"}
+            return 201, dict(json, id=f"{json['name']}-id", status="insufficient")
+
+        api.routes[("POST", "/clusters")] = handler
+        return api
+
+    def payloads(self, api):
+        return sorted((kwargs["json"] for method, path, kwargs in api.sent("POST")), key=lambda p: p["name"])
+
+    def test_bulk_register(self, registrations, run_module):
+        result = run_module(clusters, dict(
+            state="present",
+            openshift_version="4.16",
+            clusters_spec=[dict(name="lab1"), dict(name="lab2", openshift_version="4.17", pull_secret="other")],
+        ))
+
+        assert result["changed"]
+        assert [(c["name"], c["failed"], c["cluster"]["id"]) for c in result["clusters"]] == [
+            ("lab1", False, "lab1-id"),
+            ("lab2", False, "lab2-id"),
+        ]
+        assert self.payloads(registrations) == [
+            dict(name="lab1", openshift_version="4.16", pull_secret="{}"),
+            dict(name="lab2", openshift_version="4.17", pull_secret="other"),
+        ]
+
+    def test_bulk_register_reports_every_failure(self, registrations, run_module):
+        result = run_module(clusters, dict(
+            state="present",
+            openshift_version="4.16",
+            clusters_spec=[dict(name="taken"), dict(name="lab1"), dict(openshift_version="4.17")],
+        ))
+
+        assert result["failed"] and result["changed"]
+        assert [(c["name"], c["failed"]) for c in result["clusters"]] == [("taken", True), ("lab1", False), (None, True)]
+        assert "name already used" in result["clusters"][0]["response"]
+        # The element without name is never sent
+        assert [p["name"] for p in self.payloads(registrations)] == ["lab1", "taken"]
+
+    def test_register(self, registrations, run_module):
+        result = run_module(clusters, dict(state="present", name="lab1", openshift_version="4.16"))
+
+        assert result["clusters"]["id"] == "lab1-id"
+        assert self.payloads(registrations)[0]["pull_secret"] == "{}"
+
+
+class TestDelete:
+
+    @pytest.fixture
+    def account(self, api):
+        api.routes[("GET", "/clusters")] = (200, [
+            cluster("c1", "ci-1", created_at="2024-01-01T00:00:00Z"),
+            cluster("c2", "ci-2", status="installed", created_at="2024-01-01T00:00:00Z"),
+            cluster("c3", "lab1", created_at="2024-01-01T00:00:00Z"),
+            cluster("c4", "ci-4", created_at="2999-01-01T00:00:00Z"),
+        ])
+        for cluster_id in ("c1", "c2", "c3", "c4"):
+            api.routes[("DELETE", f"/clusters/{cluster_id}")] = (204, None)
+        return api
+
+    def deleted(self, api):
+        return sorted(path.rpartition("/")[2] for method, path, kwargs in api.sent("DELETE"))
+
+    def test_by_pattern(self, account, run_module):
+        result = run_module(clusters, dict(state="absent", name_pattern="ci-*"))
+
+        assert result["changed"]
+        assert self.deleted(account) == ["c1", "c2", "c4"]
+
+    def test_by_pattern_age_and_status(self, account, run_module):
+        result = run_module(clusters, dict(state="absent", name_pattern="ci-*", older_than_hours=24, status=["ready"]))
+
+        assert [(c["id"], c["deleted"]) for c in result["clusters"]] == [("c1", True)]
+        assert self.deleted(account) == ["c1"]
+
+    @pytest.mark.parametrize("args", [dict(status=["ready"]), dict(status=[]), dict(name_pattern="")])
+    def test_never_everything(self, account, run_module, args):
+        result = run_module(clusters, dict(state="absent") | args)
+
+        assert result.get("failed") or result["clusters"] == []
+        assert self.deleted(account) == []
+
+    def test_by_ids(self, account, run_module):
+        result = run_module(clusters, dict(state="absent", cluster_ids=["c3", "gone"]))
+
+        assert result["changed"]
+        assert [(c["id"], c["deleted"], c["failed"]) for c in result["clusters"]] == [
+            ("c3", True, False),
+            ("gone", False, False),
+        ]
+
+    def test_failures_are_reported(self, account, run_module):
+        account.routes[("DELETE", "/clusters/c2")] = (409, {"reason": "installing"})
+
+        result = run_module(clusters, dict(state="absent", cluster_ids=["c1", "c2"]))
+
+        assert result["failed"] and result["changed"]
+        assert [(c["id"], c["failed"]) for c in result["clusters"]] == [("c1", False), ("c2", True)]
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import gzip
+import json
+
+import pytest
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.modules import events
+
+
+def event(cluster_id, second, name="cluster_status_updated", severity="info"):
+    return dict(
+        cluster_id=cluster_id,
+        event_time=f"2024-11-08T20:15:{second:02d}.000Z",
+        name=name,
+        message=f"{name} at {second}",
+        severity=severity,
+    )
+
+
+def serve_events(api, history):
+    """Answer /events from history, a dict of cluster_id to its ascending events."""
+
+    def handler(params=None, **kwargs):
+        params = params or {}
+        selected = history.get(params.get("cluster_id"))
+        if selected is None:
+            return 404, {"reason": "cluster not found"}
+        if params.get("order") == "descending":
+            selected = selected[::-1]
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        return 200, selected[offset:offset + int(limit) if limit is not None else None]
+
+    api.routes[("GET", "/events")] = handler
+
+
+@pytest.fixture
+def cursor_file(tmp_path):
+    return str(tmp_path / "cursors.json")
+
+
+class TestFollow:
+
+    def test_first_run_returns_everything_and_saves_cursor(self, api, run_module, cursor_file):
+        history = {"c1": [event("c1", 1), event("c1", 2), event("c1", 3)]}
+        serve_events(api, history)
+
+        result = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file, page_size=2))
+
+        assert [e["event_time"] for e in result["cluster_events"]] == [e["event_time"] for e in history["c1"]]
+        assert result["truncated"] is False
+        with open(cursor_file) as f:
+            cursor = json.load(f)["c1"]
+        assert cursor["offset"] == 3
+        assert cursor["event_time"] == history["c1"][-1]["event_time"]
+
+    def test_next_run_only_returns_new_events(self, api, run_module, cursor_file):
+        history = {"c1": [event("c1", 1), event("c1", 2)]}
+        serve_events(api, history)
+        run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file))
+
+        history["c1"].append(event("c1", 3, name="host_registration_succeeded"))
+        api.requests.clear()
+        result = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file))
+
+        assert [e["name"] for e in result["cluster_events"]] == ["host_registration_succeeded"]
+        assert result["changed"] is False
+        # The known events are skipped server side
+        assert api.sent("GET", "/events")[0][2]["params"]["offset"] == 2
+
+    def test_nothing_new(self, api, run_module, cursor_file):
+        serve_events(api, {"c1": [event("c1", 1)]})
+        run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file))
+
+        result = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file))
+
+        assert result["cluster_events"] == []
+
+    def test_shifted_offset_does_not_replay_events(self, api, run_module, cursor_file):
+        history = {"c1": [event("c1", 1), event("c1", 2), event("c1", 3)]}
+        serve_events(api, history)
+        run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file))
+
+        # A late event lands before the cursor, the saved offset now points at a known event
+        history["c1"].insert(1, event("c1", 1, name="host_registration_succeeded"))
+        history["c1"].append(event("c1", 4))
+        result = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file))
+
+        assert [e["event_time"] for e in result["cluster_events"]] == [history["c1"][4]["event_time"]]
+
+    def test_limit_truncates_and_resumes(self, api, run_module, cursor_file):
+        history = {"c1": [event("c1", second) for second in range(1, 6)]}
+        serve_events(api, history)
+
+        first = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file, limit=3))
+        second = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file, limit=3))
+
+        assert first["truncated"] is True
+        assert [e["event_time"] for e in first["cluster_events"]] == [e["event_time"] for e in history["c1"][:3]]
+        assert second["truncated"] is False
+        assert [e["event_time"] for e in second["cluster_events"]] == [e["event_time"] for e in history["c1"][3:]]
+
+    def test_cursors_are_kept_per_severity_filter(self, api, run_module, cursor_file):
+        serve_events(api, {"c1": [event("c1", 1)]})
+
+        run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file, severities=["error"]))
+
+        with open(cursor_file) as f:
+            assert list(json.load(f)) == ["c1|error"]
+
+    def test_requires_ascending_order(self, api, run_module, cursor_file):
+        result = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file, order="descending"))
+
+        assert result["failed"] is True
+        assert "ascending" in result["msg"]
+
+    def test_api_error_keeps_cursor(self, api, run_module, cursor_file):
+        serve_events(api, {})
+
+        result = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file))
+
+        assert result["failed"] is True
+        assert result["msg"] == "Error listing cluster events"
+        with pytest.raises(FileNotFoundError):
+            open(cursor_file)
+
+
+class TestFleet:
+
+    def test_events_are_merged_by_time(self, api, run_module):
+        history = {
+            "c1": [event("c1", 1), event("c1", 4), event("c1", 5)],
+            "c2": [event("c2", 2), event("c2", 3), event("c2", 6)],
+        }
+        serve_events(api, history)
+
+        result = run_module(events, dict(cluster_ids=["c1", "c2"], page_size=2))
+
+        assert [(e["cluster_id"], e["event_time"][17:19]) for e in result["cluster_events"]] == [
+            ("c1", "01"), ("c2", "02"), ("c2", "03"), ("c1", "04"), ("c1", "05"), ("c2", "06"),
+        ]
+        assert result["errors"] == {}
+        assert result["truncated"] is False
+
+    def test_descending_order(self, api, run_module):
+        serve_events(api, {"c1": [event("c1", 1), event("c1", 3)], "c2": [event("c2", 2)]})
+
+        result = run_module(events, dict(cluster_ids=["c1", "c2"], order="descending"))
+
+        assert [e["event_time"][17:19] for e in result["cluster_events"]] == ["03", "02", "01"]
+
+    def test_failed_cluster_is_reported(self, api, run_module):
+        serve_events(api, {"c1": [event("c1", 1)]})
+
+        result = run_module(events, dict(cluster_ids=["c1", "missing"]))
+
+        assert "failed" not in result
+        assert [e["cluster_id"] for e in result["cluster_events"]] == ["c1"]
+        assert list(result["errors"]) == ["missing"]
+
+    def test_fails_when_every_cluster_failed(self, api, run_module):
+        serve_events(api, {})
+
+        result = run_module(events, dict(cluster_ids=["c1", "c2"]))
+
+        assert result["failed"] is True
+        assert sorted(result["errors"]) == ["c1", "c2"]
+
+    def test_follow_keeps_one_cursor_per_cluster(self, api, run_module, cursor_file):
+        history = {"c1": [event("c1", 1)], "c2": [event("c2", 2)]}
+        serve_events(api, history)
+        run_module(events, dict(cluster_ids=["c1", "c2"], follow=True, cursor_file=cursor_file))
+
+        history["c2"].append(event("c2", 3))
+        result = run_module(events, dict(cluster_ids=["c1", "c2"], follow=True, cursor_file=cursor_file))
+
+        assert [(e["cluster_id"], e["event_time"][17:19]) for e in result["cluster_events"]] == [("c2", "03")]
+        with open(cursor_file) as f:
+            cursors = json.load(f)
+        assert cursors["c1"]["offset"] == 1
+        assert cursors["c2"]["offset"] == 2
+
+    def test_follow_does_not_move_cursor_of_failed_cluster(self, api, run_module, cursor_file):
+        serve_events(api, {"c1": [event("c1", 1)]})
+
+        run_module(events, dict(cluster_ids=["c1", "missing"], follow=True, cursor_file=cursor_file))
+
+        with open(cursor_file) as f:
+            assert list(json.load(f)) == ["c1"]
+
+
+class TestSummary:
+
+    def test_summary_without_events(self, api, run_module):
+        serve_events(api, {"c1": [
+            event("c1", 1),
+            event("c1", 2, name="host_install_failed", severity="error"),
+            event("c1", 3, name="cluster_registration_succeeded"),
+        ]})
+
+        result = run_module(events, dict(cluster_id="c1", all_pages=True, summary=True, return_events=False))
+
+        assert "cluster_events" not in result
+        summary = result["summary"]
+        assert summary["total"] == 3
+        assert summary["by_severity"] == {"info": 2, "error": 1}
+        assert summary["last_status_update"]["event_time"].endswith(":01.000Z")
+        assert [e["name"] for e in summary["last_errors"]] == ["host_install_failed"]
+        assert summary["first_event_time"].endswith(":01.000Z")
+        assert summary["last_event_time"].endswith(":03.000Z")
+
+
+class TestDest:
+
+    def test_events_are_written_not_returned(self, api, run_module, tmp_path):
+        history = {"c1": [event("c1", 1), event("c1", 2)]}
+        serve_events(api, history)
+        dest = str(tmp_path / "events.ndjson")
+
+        result = run_module(events, dict(cluster_id="c1", all_pages=True, dest=dest))
+
+        assert "cluster_events" not in result
+        assert result["written"] == 2
+        assert result["changed"] is True
+        with open(dest) as f:
+            assert [json.loads(line) for line in f] == history["c1"]
+
+    def test_compressed_append(self, api, run_module, tmp_path):
+        serve_events(api, {"c1": [event("c1", 1)]})
+        dest = str(tmp_path / "events.ndjson.gz")
+
+        run_module(events, dict(cluster_id="c1", dest=dest, dest_compress=True))
+        run_module(events, dict(cluster_id="c1", dest=dest, dest_compress=True, dest_append=True))
+
+        with gzip.open(dest, "rt", encoding="utf-8") as f:
+            assert len(f.readlines()) == 2
+
+    def test_follow_with_dest_saves_cursor(self, api, run_module, tmp_path, cursor_file):
+        serve_events(api, {"c1": [event("c1", 1)]})
+
+        result = run_module(events, dict(cluster_id="c1", follow=True, cursor_file=cursor_file, dest=str(tmp_path / "events.ndjson")))
+
+        assert result["written"] == 1
+        with open(cursor_file) as f:
+            assert json.load(f)["c1"]["offset"] == 1
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.module_utils import download
+from ansible_collections.openshift_lab.assisted_installer.plugins.modules import infra_envs
+
+
+def infra_env(infra_env_id, name):
+    return dict(
+        id=infra_env_id,
+        name=name,
+        openshift_version="4.16",
+        cpu_architecture="x86_64",
+        type="minimal-iso",
+        download_url=f"https://images.example.com/{infra_env_id}/minimal.iso",
+    )
+
+
+def create(status_code=201):
+    def handler(json=None, **kwargs):
+        if status_code >= 400:
+            return status_code, {"reason": "invalid"}
+        return status_code, infra_env(f"{json['name']}-id", json["name"])
+    return handler
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    calls = []
+
+    def fake_download(client, url, dest, **kwargs):
+        calls.append((url, dest, kwargs))
+        return dict(changed=True, dest=dest, size=1024)
+
+    monkeypatch.setattr(download, "Download", fake_download)
+    return calls
+
+
+def test_create(api, run_module):
+    api.routes[("POST", "/infra-envs")] = create()
+
+    result = run_module(infra_envs, dict(state="present", name="infra1", pull_secret="{}", image_type="minimal-iso"))
+
+    assert result["changed"]
+    assert result["infra_envs"]["id"] == "infra1-id"
+    # Unset options are not sent
+    assert api.sent("POST")[0][2]["json"] == dict(name="infra1", pull_secret="{}", image_type="minimal-iso")
+
+
+def test_create_and_download(api, run_module, downloads, tmp_path):
+    api.routes[("POST", "/infra-envs")] = create()
+    dest = str(tmp_path / "infra1.iso")
+
+    result = run_module(infra_envs, dict(state="present", name="infra1", pull_secret="{}", download_dest=dest))
+
+    assert result["changed"]
+    assert result["download"]["dest"] == dest
+    assert downloads[0][:2] == ("https://images.example.com/infra1-id/minimal.iso", dest)
+
+
+def test_bulk_create(api, run_module):
+    api.routes[("POST", "/infra-envs")] = create()
+
+    result = run_module(infra_envs, dict(
+        state="present",
+        pull_secret="{}",
+        openshift_version="4.16",
+        infra_envs_spec=[dict(name="lab1-infra", cluster_id="c1"), dict(name="lab2-infra", openshift_version="4.17")],
+    ))
+
+    assert result["changed"]
+    assert [(i["name"], i["failed"]) for i in result["infra_envs"]] == [("lab1-infra", False), ("lab2-infra", False)]
+    payloads = sorted((r[2]["json"] for r in api.sent("POST")), key=lambda p: p["name"])
+    assert payloads == [
+        dict(name="lab1-infra", cluster_id="c1", openshift_version="4.16", pull_secret="{}"),
+        dict(name="lab2-infra", openshift_version="4.17", pull_secret="{}"),
+    ]
+
+
+def test_bulk_create_reports_every_failure(api, run_module):
+    api.routes[("POST", "/infra-envs")] = create(400)
+
+    result = run_module(infra_envs, dict(state="present", pull_secret="{}", infra_envs_spec=[dict(name="a"), dict()]))
+
+    assert result["failed"]
+    assert [i["failed"] for i in result["infra_envs"]] == [True, True]
+    assert len(api.sent("POST")) == 1
+
+
+def test_get_and_download(api, run_module, downloads, tmp_path):
+    api.routes[("GET", "/infra-envs/i1")] = (200, infra_env("i1", "infra1"))
+    dest = str(tmp_path / "i1.iso")
+
+    result = run_module(infra_envs, dict(infra_env_id="i1", download_dest=dest, download_checksum="sha256:abc"))
+
+    assert result["changed"]
+    assert downloads[0][2]["checksum"] == "sha256:abc"
+
+
+def test_bulk_get(api, run_module):
+    api.routes[("GET", "/infra-envs/i1")] = (200, infra_env("i1", "infra1"))
+
+    result = run_module(infra_envs, dict(infra_env_ids=["i1", "missing"]))
+
+    assert result["failed"]
+    assert [(i["id"], i["failed"]) for i in result["infra_envs"]] == [("i1", False), ("missing", True)]
+
+
+def test_bulk_delete(api, run_module):
+    api.routes[("DELETE", "/infra-envs/i1")] = (204, None)
+
+    result = run_module(infra_envs, dict(state="absent", infra_env_ids=["i1", "gone"]))
+
+    assert result["changed"]
+    assert [(i["id"], i["deleted"], i["failed"]) for i in result["infra_envs"]] == [
+        ("i1", True, False),
+        ("gone", False, False),
+    ]
+
+
+def test_list_by_cluster(api, run_module):
+    api.routes[("GET", "/infra-envs")] = (200, [infra_env("i1", "infra1")])
+
+    result = run_module(infra_envs, dict(cluster_id="c1"))
+
+    assert [i["id"] for i in result["infra_envs"]] == ["i1"]
+    assert api.sent("GET")[0][2]["params"] == {"cluster_id": "c1"}
+
+
+@pytest.mark.parametrize("args", [
+    dict(state="present", pull_secret="{}", infra_envs_spec=[dict(name="a")]),
+    dict(infra_env_ids=["i1", "i2"]),
+])
+def test_download_dest_needs_a_single_infra_env(api, run_module, args):
+    result = run_module(infra_envs, args | dict(download_dest="/tmp/x.iso"))
+
+    assert result["failed"]
+    assert "mutually exclusive" in result["msg"]
+    assert api.requests == []
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.modules import openshift_versions
+
+VERSIONS = {
+    "4.16.9": {"display_name": "4.16.9", "support_level": "production"},
+    "4.16.10": {"display_name": "4.16.10", "support_level": "production", "default": True},
+    "4.16.10-multi": {"display_name": "4.16.10-multi", "support_level": "production"},
+    "4.17.0-rc.2": {"display_name": "4.17.0-rc.2", "support_level": "beta"},
+}
+
+
+@pytest.fixture
+def versions(api):
+    api.routes[("GET", "/openshift-versions")] = (200, VERSIONS)
+    return api
+
+
+def test_unfiltered_returns_the_api_response(versions, run_module):
+    result = run_module(openshift_versions, dict(version="4.17"))
+
+    assert result["versions"] == VERSIONS
+    assert result["sorted_versions"] == ["4.16.9", "4.16.10", "4.16.10-multi", "4.17.0-rc.2"]
+    assert result["latest"] == "4.17.0-rc.2"
+    assert versions.sent()[0][2]["params"] == {"version": "4.17"}
+
+
+def test_constraint_excludes_prereleases(versions, run_module):
+    result = run_module(openshift_versions, dict(constraint=">=4.16.10"))
+
+    assert sorted(result["versions"]) == ["4.16.10", "4.16.10-multi"]
+    assert result["latest"] == "4.16.10"
+
+
+def test_constraint_with_prereleases(versions, run_module):
+    result = run_module(openshift_versions, dict(constraint=">=4.16.10", include_prereleases=True))
+
+    assert result["sorted_versions"] == ["4.16.10", "4.16.10-multi", "4.17.0-rc.2"]
+
+
+@pytest.mark.parametrize("args, expected", [
+    (dict(latest_per_minor=True), ["4.16.10", "4.16.10-multi"]),
+    (dict(default_only=True), ["4.16.10"]),
+    (dict(support_level=["beta"]), []),
+    (dict(support_level=["beta"], include_prereleases=True), ["4.17.0-rc.2"]),
+])
+def test_filters(versions, run_module, args, expected):
+    result = run_module(openshift_versions, args)
+
+    assert result["sorted_versions"] == expected
+    assert sorted(result["versions"]) == sorted(expected)
+
+
+def test_invalid_constraint(versions, run_module):
+    result = run_module(openshift_versions, dict(constraint="~4.16"))
+
+    assert result["failed"]
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.openshift_lab.assisted_installer.plugins.modules import support_levels
+
+
+def serve_features(api):
+    def handler(params=None, **kwargs):
+        feature = f"{params['openshift_version']}/{params['cpu_architecture']}/{params.get('platform_type', 'none')}"
+        return 200, {"features": {feature: "supported"}}
+
+    api.routes[("GET", "/support-levels/features")] = handler
+
+
+def serve_architectures(api):
+    def handler(params=None, **kwargs):
+        return 200, {"architectures": {"x86_64": "supported", "s390x": f"tech-preview-{params['openshift_version']}"}}
+
+    api.routes[("GET", "/support-levels/architectures")] = handler
+
+
+def test_single_combination_returns_the_api_response(api, run_module):
+    serve_features(api)
+
+    result = run_module(support_levels, dict(resource_type="features", openshift_version=["4.16"]))
+
+    assert result["features"] == {"4.16/x86_64/none": "supported"}
+    assert result["matrix"] == {"4.16": {"x86_64": {"default": {"4.16/x86_64/none": "supported"}}}}
+
+
+def test_features_matrix(api, run_module):
+    serve_features(api)
+
+    result = run_module(support_levels, dict(
+        resource_type="features",
+        openshift_version=["4.16", "4.17"],
+        cpu_architecture=["x86_64", "arm64"],
+        platform_type=["baremetal", "vsphere"],
+    ))
+
+    assert "features" not in result
+    assert len(api.sent("GET", "/support-levels/features")) == 8
+    assert result["matrix"]["4.17"]["arm64"]["vsphere"] == {"4.17/arm64/vsphere": "supported"}
+    assert sorted(result["matrix"]["4.16"]["x86_64"]) == ["baremetal", "vsphere"]
+
+
+def test_architectures_share_one_query_per_version(api, run_module):
+    serve_architectures(api)
+
+    result = run_module(support_levels, dict(
+        resource_type="architectures",
+        openshift_version=["4.16", "4.17"],
+        cpu_architecture=["x86_64", "arm64", "s390x"],
+    ))
+
+    assert len(api.sent("GET", "/support-levels/architectures")) == 2
+    assert result["matrix"]["4.17"]["s390x"] == "tech-preview-4.17"
+
+
+def test_failed_query_is_reported(api, run_module):
+    def handler(params=None, **kwargs):
+        if params.get("platform_type") == "nutanix":
+            return 400, {"reason": "nutanix is not supported on 4.16"}
+        return 200, {"features": {}}
+
+    api.routes[("GET", "/support-levels/features")] = handler
+
+    result = run_module(support_levels, dict(resource_type="features", openshift_version=["4.16"], platform_type=["baremetal", "nutanix"]))
+
+    assert result["failed"] is True
+    assert [e["query"]["platform_type"] for e in result["errors"]] == ["nutanix"]
+    assert "nutanix is not supported" in result["errors"][0]["response"]